@@ -0,0 +1,244 @@
+"""
+Adisyo POS Sistemi - Analiz Motoru
+Odenmis siparisleri tek sorguda sutun dizilerine ceker ve NumPy ile
+saat x gun ciro isi haritasi, birlikte satilan urun ciftleri (support / lift)
+ve menu muhendisligi dortlu siniflandirmasini hesaplar. NumPy ilk
+kullanimda (ya da acilistan sonra arka planda) bir kez yuklenir.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+np = None  # load_numpy() ile yuklenir; False: kurulu degil
+
+
+WEEKDAYS = ['Pazartesi', 'Sali', 'Carsamba', 'Persembe', 'Cuma', 'Cumartesi', 'Pazar']
+
+CACHE_SIZE = 32
+LIVE_CACHE_TTL = 60  # Bugunu iceren araliklar icin saniye
+PAIR_CHUNK_SIZE = 20000  # Siparis x urun matrisi bu boyutta parcalanir
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+LINES_SQL = text("""
+    SELECT o.id,
+           o.total,
+           CAST(strftime('%H', o.closed_at) AS INTEGER),
+           CAST(strftime('%w', o.closed_at) AS INTEGER),
+           oi.menu_item_id,
+           oi.quantity,
+           oi.price
+    FROM orders o
+    LEFT JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.status = 'paid'
+      AND o.closed_at >= :start
+      AND o.closed_at < :end
+    ORDER BY o.id
+""")
+
+MENU_SQL = text('SELECT id, name FROM menu_items')
+
+
+def load_numpy():
+    """NumPy'i bir kez yukle; kurulu degilse tekrar denenmez"""
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = False
+    return np
+
+
+def is_available():
+    return load_numpy() is not False
+
+
+def load_columns(session, start, end):
+    """Aralikta kapanan siparis kalemlerini sutun dizileri olarak getir"""
+    rows = session.execute(LINES_SQL, {'start': start, 'end': end}).fetchall()
+    if not rows:
+        empty_i = np.empty(0, dtype=np.int64)
+        empty_f = np.empty(0, dtype=np.float64)
+        return {'order_id': empty_i, 'order_total': empty_f, 'hour': empty_i,
+                'weekday': empty_i, 'menu_item_id': empty_i,
+                'quantity': empty_i, 'price': empty_f}
+
+    order_id, order_total, hour, weekday, menu_item_id, quantity, price = zip(*rows)
+    return {
+        'order_id': np.array(order_id, dtype=np.int64),
+        'order_total': np.array(order_total, dtype=np.float64),
+        'hour': np.array(hour, dtype=np.int64),
+        # SQLite %w: 0=Pazar -> 0=Pazartesi
+        'weekday': (np.array(weekday, dtype=np.int64) + 6) % 7,
+        # Kalemsiz siparislerde LEFT JOIN NULL dondurur
+        'menu_item_id': np.array([m if m is not None else -1 for m in menu_item_id], dtype=np.int64),
+        'quantity': np.array([q or 0 for q in quantity], dtype=np.int64),
+        'price': np.array([p or 0 for p in price], dtype=np.float64),
+    }
+
+
+def hourly_heatmap(cols):
+    """Gun (satir) x saat (sutun) ciro ve siparis sayisi matrisleri"""
+    revenue = np.zeros((7, 24))
+    orders = np.zeros((7, 24), dtype=np.int64)
+
+    # Her siparis birden fazla satirda tekrar eder, ilk satirini al
+    _, first = np.unique(cols['order_id'], return_index=True)
+    np.add.at(revenue, (cols['weekday'][first], cols['hour'][first]), cols['order_total'][first])
+    np.add.at(orders, (cols['weekday'][first], cols['hour'][first]), 1)
+
+    return {
+        'weekdays': WEEKDAYS,
+        'hours': list(range(24)),
+        'revenue': np.round(revenue, 2).tolist(),
+        'orders': orders.tolist(),
+    }
+
+
+def item_pairs(cols, names, min_support=0.01, limit=20):
+    """Birlikte satilan urun ciftleri (support, confidence, lift)"""
+    mask = cols['menu_item_id'] >= 0
+    order_ids = cols['order_id'][mask]
+    item_ids = cols['menu_item_id'][mask]
+    if order_ids.size == 0:
+        return []
+
+    order_idx = np.unique(order_ids, return_inverse=True)[1]
+    items, item_idx = np.unique(item_ids, return_inverse=True)
+    n_orders = int(order_idx.max()) + 1
+    n_items = items.size
+
+    # Siparis x urun 0/1 matrisi; bellek icin parca parca carpilir
+    co = np.zeros((n_items, n_items), dtype=np.float64)
+    for start in range(0, n_orders, PAIR_CHUNK_SIZE):
+        end = min(start + PAIR_CHUNK_SIZE, n_orders)
+        sel = (order_idx >= start) & (order_idx < end)
+        basket = np.zeros((end - start, n_items), dtype=np.float32)
+        basket[order_idx[sel] - start, item_idx[sel]] = 1
+        co += basket.T @ basket
+
+    item_support = np.diag(co) / n_orders
+    pair_support = co / n_orders
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = pair_support / np.outer(item_support, item_support)
+        confidence = pair_support / item_support[:, None]
+
+    a, b = np.triu_indices(n_items, k=1)
+    keep = pair_support[a, b] >= min_support
+    a, b = a[keep], b[keep]
+    order = np.lexsort((-pair_support[a, b], -lift[a, b]))[:limit]
+
+    return [{
+        'item_a': names.get(int(items[i]), str(items[i])),
+        'item_b': names.get(int(items[j]), str(items[j])),
+        'count': int(co[i, j]),
+        'support': round(float(pair_support[i, j]), 4),
+        'confidence': round(float(confidence[i, j]), 4),
+        'lift': round(float(lift[i, j]), 3),
+    } for i, j in zip(a[order], b[order])]
+
+
+def menu_engineering(cols, names):
+    """Menu muhendisligi: populerlik x birim katki dortlu siniflandirmasi.
+
+    Maliyet verisi olmadigi icin birim katki olarak ortalama satis fiyati
+    kullanilir. Aralikta hic satmayan urunler 'dog' sayilir.
+    """
+    mask = cols['menu_item_id'] >= 0
+    item_ids = cols['menu_item_id'][mask]
+    qty = cols['quantity'][mask]
+    revenue = qty * cols['price'][mask]
+
+    all_ids = np.array(sorted(names), dtype=np.int64)
+    if all_ids.size == 0:
+        return []
+    idx = np.searchsorted(all_ids, item_ids)
+    known = (idx < all_ids.size) & (all_ids[np.minimum(idx, all_ids.size - 1)] == item_ids)
+
+    sold = np.bincount(idx[known], weights=qty[known], minlength=all_ids.size)
+    earned = np.bincount(idx[known], weights=revenue[known], minlength=all_ids.size)
+
+    total_sold = sold.sum()
+    mix = sold / total_sold if total_sold else np.zeros_like(sold)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unit_margin = np.where(sold > 0, earned / sold, 0.0)
+    # Klasik esikler: %70 populerlik kurali ve agirlikli ortalama katki
+    popularity_threshold = 0.7 / all_ids.size
+    margin_threshold = earned.sum() / total_sold if total_sold else 0.0
+
+    popular = mix >= popularity_threshold
+    profitable = unit_margin >= margin_threshold
+    quadrant = np.where(popular, np.where(profitable, 'star', 'plowhorse'),
+                        np.where(profitable, 'puzzle', 'dog'))
+    quadrant[sold == 0] = 'dog'
+
+    result = [{
+        'menu_item_id': int(item_id),
+        'name': names[int(item_id)],
+        'quantity': int(sold[i]),
+        'revenue': round(float(earned[i]), 2),
+        'mix': round(float(mix[i]), 4),
+        'unit_margin': round(float(unit_margin[i]), 2),
+        'quadrant': str(quadrant[i]),
+    } for i, item_id in enumerate(all_ids)]
+    result.sort(key=lambda r: r['quantity'])
+    return result
+
+
+def compute(session, start_date, end_date, min_support=0.01, pair_limit=20):
+    """Tarih araligi (her iki gun dahil) icin tum analizleri hesapla"""
+    load_numpy()
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    started = time.perf_counter()
+
+    cols = load_columns(session, start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S'))
+    names = {row[0]: row[1] for row in session.execute(MENU_SQL)}
+    quadrants = menu_engineering(cols, names)
+
+    return {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'order_count': int(np.unique(cols['order_id']).size),
+        'line_count': int((cols['menu_item_id'] >= 0).sum()),
+        'heatmap': hourly_heatmap(cols),
+        'pairs': item_pairs(cols, names, min_support, pair_limit),
+        'menu_engineering': quadrants,
+        'slow_items': [r for r in quadrants if r['quadrant'] in ('dog', 'puzzle')][:10],
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def get_analytics(session, start_date, end_date, min_support=0.01, pair_limit=20):
+    """Onbellekli analiz. Gecmis araliklar kalici, bugunu icerenler kisa sure onbellekte kalir."""
+    key = (start_date, end_date, min_support, pair_limit)
+    live = end_date >= datetime.now().date()
+    now = time.monotonic()
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and (not live or now - cached[0] < LIVE_CACHE_TTL):
+            _cache.move_to_end(key)
+            return cached[1]
+
+    result = compute(session, start_date, end_date, min_support, pair_limit)
+
+    with _cache_lock:
+        _cache[key] = (now, result)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
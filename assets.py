@@ -0,0 +1,160 @@
+"""
+Adisyo POS Sistemi - Statik Dosya Hatti
+app.js ve styles.css dosyalarini kucultur, icerik hash'i ile parmak izli
+kopyalarini static/dist altina yazar ve sablonlara asset_url() yardimcisini
+saglar. Parmak izli dosyalar degismez oldugu icin bir yil onbellekte kalir.
+
+Sunucu calisirken derleme yapilabilir: manifest degistiginde yeniden okunur,
+acik sayfalarin istedigi onceki derlemeler (KEEP_BUILDS) silinmez. Kaynak
+dosya manifestten yeniyse (derleme unutulmussa) kaynak dosya verilir.
+
+Kullanim: flask --app main build-assets  veya  python assets.py
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from flask import current_app, request, url_for
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+
+ASSETS = ['js/app.js', 'css/styles.css']
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+KEEP_BUILDS = 3  # Dosya basina saklanan derleme sayisi (guncel dahil)
+
+_loaded = {'path': None, 'mtime': None, 'manifest': {}}
+
+
+def minify_css(source):
+    """CSS kucult (rcssmin yoksa basit kucultme)"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};:,>])\s*', r'\1', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """JS kucult (rjsmin yoksa sadece girinti, bos satir ve satir yorumlari)"""
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+    # Template string'leri bozmamak icin satir bazinda guvenli kucultme
+    lines = []
+    for line in source.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('//'):
+            continue
+        lines.append(stripped)
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+def build(static_folder):
+    """Statik dosyalari kucult ve parmak izli kopyalarini yaz"""
+    dist_path = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist_path, exist_ok=True)
+
+    manifest = {}
+    for filename in ASSETS:
+        with open(os.path.join(static_folder, filename), encoding='utf-8') as f:
+            source = f.read()
+
+        base, ext = os.path.splitext(filename)
+        content = MINIFIERS[ext](source).encode('utf-8')
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        hashed_name = f'{DIST_DIR}/{os.path.basename(base)}.{digest}{ext}'
+
+        with open(os.path.join(static_folder, hashed_name), 'wb') as f:
+            f.write(content)
+        manifest[filename] = hashed_name
+
+    # Manifest yerine atomik olarak gecer; okuyan yarim dosya gormez
+    path = os.path.join(dist_path, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+    for filename, hashed_name in manifest.items():
+        prune(dist_path, filename, os.path.basename(hashed_name))
+    return manifest
+
+
+def prune(dist_path, filename, current):
+    """Bir dosyanin en yeni KEEP_BUILDS kopyasi disindakileri sil"""
+    base, ext = os.path.splitext(os.path.basename(filename))
+    pattern = re.compile(rf'{re.escape(base)}\.[0-9a-f]{{12}}{re.escape(ext)}$')
+    older = [name for name in os.listdir(dist_path) if pattern.match(name) and name != current]
+    older.sort(key=lambda name: os.path.getmtime(os.path.join(dist_path, name)), reverse=True)
+    for name in older[KEEP_BUILDS - 1:]:
+        os.remove(os.path.join(dist_path, name))
+
+
+def load_manifest(static_folder):
+    """Manifesti oku; dosya degismediyse onceki okumayi dondur (yoksa bos)"""
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    if path != _loaded['path'] or mtime != _loaded['mtime']:
+        manifest = {}
+        if mtime is not None:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        _loaded.update(path=path, mtime=mtime, manifest=manifest)
+    return _loaded['manifest']
+
+
+def asset_url(filename):
+    """Parmak izli dosya URL'i; derleme yoksa ya da kaynak daha yeniyse orijinal dosya"""
+    static_folder = current_app.static_folder
+    hashed_name = load_manifest(static_folder).get(filename)
+    if hashed_name is not None:
+        try:
+            if os.path.getmtime(os.path.join(static_folder, filename)) > _loaded['mtime']:
+                hashed_name = None  # Kaynak derlemeden sonra degismis
+        except OSError:
+            pass
+    return url_for('static', filename=hashed_name or filename)
+
+
+def add_cache_headers(response):
+    """Parmak izli dosyalari degismez olarak isaretle"""
+    if request.path.startswith(f'/static/{DIST_DIR}/') and response.status_code == 200:
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+    return response
+
+
+def init_app(app):
+    """Statik dosya hattini uygulamaya bagla"""
+    load_manifest(app.static_folder)
+    app.add_template_global(asset_url)
+    app.after_request(add_cache_headers)
+
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """Statik dosyalari kucult ve parmak izle"""
+        for source, target in build(app.static_folder).items():
+            print(f'{source} -> {target}')
+
+
+if __name__ == '__main__':
+    static_folder = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'static')
+    for source, target in build(static_folder).items():
+        print(f'{source} -> {target}')
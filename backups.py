@@ -0,0 +1,297 @@
+"""
+Adisyo POS Sistemi - Canli Yedekleme
+Veritabani calisirken SQLite online backup API ile kucuk sayfa adimlariyla
+kopyalanir. Kaynak baglantida bir okuma transaction'i acik tutulur: WAL
+modunda yazicilar beklemez ve kopya tek bir tutarli anin goruntusu olur
+(araya giren yazimlar yedeklemeyi bastan baslatmaz).
+
+Yedekler zaman damgali dosyalardir (adisyo-YYYYAAGG-SSDDss.db[.gz]); en
+yeni BACKUP_KEEP tanesi saklanir. Her yedek yazilmadan once integrity_check
+ile dogrulanir. Son yedeklemenin sonucu yedek klasorundeki
+last_backup.json'a yazilir; ayni klasoru kullanan tum surecler bunu gorur.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+try:
+    import fcntl
+except ImportError:  # Windows: surecler arasi kilit yok
+    fcntl = None
+
+
+PREFIX = 'adisyo-'
+STATUS_FILE = 'last_backup.json'
+LOCK_FILE = '.backup.lock'
+PAGES_PER_STEP = 256
+STEP_PAUSE = 0.002  # Adimlar arasi bekleme (saniye)
+RETRY_AFTER = 300  # Basarisiz yedekten sonra tekrar deneme (saniye)
+REQUIRED_TABLES = ('tables', 'orders', 'order_items', 'menu_items')
+
+
+class BackupError(Exception):
+    pass
+
+
+def _connect_readonly(path):
+    return sqlite3.connect(f'file:{quote(os.path.abspath(path))}?mode=ro', uri=True)
+
+
+def copy_database(source_path, target_path, pages=PAGES_PER_STEP, pause=STEP_PAUSE):
+    """Calisan veritabanini online backup API ile kopyala; kopyalanan sayfa sayisi"""
+    source = _connect_readonly(source_path)
+    target = sqlite3.connect(target_path)
+    copied = [0]
+
+    def progress(status, remaining, total):
+        copied[0] = total
+        if remaining and pause:
+            time.sleep(pause)
+
+    try:
+        # Acik okuma transaction'i: tum adimlar ayni anlik goruntuden okur
+        source.execute('BEGIN')
+        source.execute('SELECT count(*) FROM sqlite_master').fetchone()
+        source.backup(target, pages=pages, progress=progress)
+        target.execute('PRAGMA journal_mode=DELETE')
+    finally:
+        source.close()
+        target.close()
+    return copied[0]
+
+
+def verify_database(path):
+    """Butunluk kontrolu; tablo basina satir sayilarini dondur"""
+    try:
+        con = _connect_readonly(path)
+        try:
+            result = con.execute('PRAGMA integrity_check').fetchone()[0]
+            if result != 'ok':
+                raise BackupError(f'Butunluk kontrolu basarisiz: {result}')
+            names = [row[0] for row in con.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+            missing = [name for name in REQUIRED_TABLES if name not in names]
+            if missing:
+                raise BackupError(f'Eksik tablolar: {", ".join(missing)}')
+            return {name: con.execute(f'SELECT count(*) FROM "{name}"').fetchone()[0] for name in sorted(names)}
+        finally:
+            con.close()
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f'Gecersiz veritabani dosyasi: {e}')
+
+
+def _gzip(source_path, target_path):
+    with open(source_path, 'rb') as src, gzip.open(target_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def extract(backup_path, directory):
+    """Yedegi (gerekirse acip) duz .db dosyasi olarak ver: (yol, gecici mi)"""
+    if not backup_path.endswith('.gz'):
+        return backup_path, False
+    fd, plain_path = tempfile.mkstemp(suffix='.db', dir=directory)
+    with os.fdopen(fd, 'wb') as dst, gzip.open(backup_path, 'rb') as src:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    return plain_path, True
+
+
+def restore_database(backup_path, target_path, pages=PAGES_PER_STEP):
+    """Dogrulanmis yedegi hedef veritabanina backup API ile geri yukle.
+
+    Hedefe baglanti acik olsa bile tutarli sekilde yazilir; yine de geri
+    yukleme sirasinda uygulamanin durdurulmasi onerilir.
+    """
+    plain_path, temporary = extract(backup_path, os.path.dirname(os.path.abspath(target_path)))
+    try:
+        expected = verify_database(plain_path)
+        source = _connect_readonly(plain_path)
+        target = sqlite3.connect(target_path, timeout=30)
+        try:
+            source.backup(target, pages=pages)
+        finally:
+            source.close()
+            target.close()
+    finally:
+        if temporary:
+            os.remove(plain_path)
+
+    restored = verify_database(target_path)
+    if restored != expected:
+        raise BackupError('Geri yuklenen veritabani yedekle ayni degil')
+    return restored
+
+
+class BackupManager:
+    """Zamanlanmis yedekler, saklama sayisi ve son durum"""
+
+    def __init__(self):
+        self.source_path = None
+        self.directory = None
+        self.interval = 0
+        self.keep = 0
+        self.compress = True
+        self.running = False
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def init_app(self, app, db):
+        app.config.setdefault('BACKUP_DIR', None)
+        app.config.setdefault('BACKUP_INTERVAL', 3600)
+        app.config.setdefault('BACKUP_KEEP', 24)
+        app.config.setdefault('BACKUP_COMPRESS', True)
+
+        with app.app_context():
+            self.source_path = db.engine.url.database
+        self.directory = app.config['BACKUP_DIR'] or os.path.join(
+            os.path.dirname(os.path.abspath(self.source_path)), 'backups')
+        self.interval = app.config['BACKUP_INTERVAL']
+        self.keep = app.config['BACKUP_KEEP']
+        self.compress = app.config['BACKUP_COMPRESS']
+
+    # ---- Durum ----
+
+    def _status_path(self):
+        return os.path.join(self.directory, STATUS_FILE)
+
+    def last(self):
+        """Son yedeklemenin sonucu (hic yoksa None)"""
+        try:
+            with open(self._status_path(), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_status(self, status):
+        tmp_path = self._status_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(status, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._status_path())
+
+    def list(self):
+        """Mevcut yedekler, en yeni once"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((n for n in os.listdir(self.directory)
+                        if n.startswith(PREFIX) and (n.endswith('.db') or n.endswith('.db.gz'))), reverse=True)
+        result = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            result.append({'file': name, 'size': os.path.getsize(path),
+                           'created_at': datetime.fromtimestamp(os.path.getmtime(path)).isoformat()})
+        return result
+
+    # ---- Yedekleme ----
+
+    def _process_lock(self):
+        """Ayni klasoru kullanan diger surecler icin kilit dosyasi (alinamazsa None)"""
+        handle = open(os.path.join(self.directory, LOCK_FILE), 'w')
+        if fcntl is not None:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                return None
+        return handle
+
+    def run(self, reason='manual', rotate=True):
+        """Yedek al, dogrula, sakla ve (rotate ise) eskileri sil; sonucu dondur.
+
+        Baska bir is parcacigi / surec yedek aliyorsa None doner.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if not self._lock.acquire(blocking=False):
+            return None
+        handle = None
+        try:
+            handle = self._process_lock()
+            if handle is None:
+                return None
+            if reason == 'scheduled' and self.seconds_until_due() > 0:
+                return None  # Baska bir surec az once aldi
+            self.running = True
+            return self._run(reason, rotate)
+        finally:
+            self.running = False
+            if handle is not None:
+                handle.close()
+            self._lock.release()
+
+    def _run(self, reason, rotate):
+        started = datetime.now()
+        clock = time.perf_counter()
+        name = PREFIX + started.strftime('%Y%m%d-%H%M%S') + '.db'
+        tmp_path = os.path.join(self.directory, f'.{name}.tmp')
+        status = {'started_at': started.isoformat(), 'reason': reason}
+        try:
+            status['pages'] = copy_database(self.source_path, tmp_path)
+            status['copy_ms'] = round((time.perf_counter() - clock) * 1000, 1)
+            status['tables'] = verify_database(tmp_path)
+            status['db_size'] = os.path.getsize(tmp_path)
+
+            if self.compress:
+                name += '.gz'
+                _gzip(tmp_path, tmp_path + '.gz')
+                os.remove(tmp_path)
+                tmp_path += '.gz'
+            path = os.path.join(self.directory, name)
+            os.replace(tmp_path, path)
+
+            status.update(file=name, size=os.path.getsize(path), compressed=self.compress, error=None)
+            status['removed'] = self.rotate() if rotate else []
+        except (BackupError, OSError, sqlite3.Error) as e:
+            for leftover in (tmp_path, tmp_path + '.gz'):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            status['error'] = str(e)
+        status['finished_at'] = datetime.now().isoformat()
+        status['duration_ms'] = round((time.perf_counter() - clock) * 1000, 1)
+        self._write_status(status)
+        return status
+
+    def rotate(self):
+        """En yeni self.keep yedek disindakileri sil; silinen dosya adlari"""
+        removed = []
+        for backup in self.list()[self.keep:]:
+            os.remove(os.path.join(self.directory, backup['file']))
+            removed.append(backup['file'])
+        return removed
+
+    # ---- Zamanlama ----
+
+    def start(self):
+        """Zamanlanmis yedekleme is parcacigini baslat (BACKUP_INTERVAL > 0 ise)"""
+        if self.interval <= 0:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name='backups', daemon=True)
+            self._thread.start()
+
+    def seconds_until_due(self):
+        last = self.last()
+        if not last:
+            return 0
+        age = (datetime.now() - datetime.fromisoformat(last['started_at'])).total_seconds()
+        wait = min(self.interval, RETRY_AFTER) if last.get('error') else self.interval
+        return max(0, wait - age)
+
+    def _loop(self):
+        while True:
+            # Diger surecler de ayni durum dosyasina bakar; sadece biri yedek alir
+            time.sleep(min(max(self.seconds_until_due(), 1), 60))
+            if self.seconds_until_due() > 0:
+                continue
+            try:
+                self.run('scheduled')
+            except Exception as e:
+                print(f"Yedekleme hatasi: {e}")
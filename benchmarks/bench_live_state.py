@@ -0,0 +1,114 @@
+"""
+Canli durum (bellek ici masalar) benchmark'i
+
+Gecici bir veritabaninda rastgele masa / siparis islemleri yapar; araya
+ikinci bir surecin (baska worker) yazimlarini da katar. Her turdan sonra
+bellekteki durumun veritabanindan uretilen ciktiyla ayni oldugunu kontrol
+eder. Sonunda /api/tables ve /api/tables/<id> okuma gecikmesini bellekten
+ve veritabanindan olcer.
+
+Kullanim: python benchmarks/bench_live_state.py
+"""
+
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+ROUNDS = 30
+OPS_PER_ROUND = 20
+READS = 500
+
+
+def load_app(db_path):
+    os.environ['ADISYO_DB'] = db_path
+    sys.path.insert(0, ROOT)
+    import main
+    return main
+
+
+def seed(db_path):
+    main = load_app(db_path)
+    with main.app.app_context():
+        main.init_database()
+
+
+def random_ops(client, rng, count):
+    """Masa ac, urun ekle / degistir / sil, odeme al"""
+    tables = [t['id'] for t in client.get('/api/tables?fields=id').get_json()['data']]
+    for _ in range(count):
+        data = client.post(f'/api/tables/{rng.choice(tables)}/open').get_json()['data']
+        order_id, items, version = data['id'], data['items'], data['version']
+        action = rng.random()
+        if action < 0.5 or not items:
+            client.post(f'/api/orders/{order_id}/items',
+                        json={'menu_item_id': rng.randint(1, 20), 'quantity': rng.randint(1, 3), 'version': version})
+        elif action < 0.7:
+            client.put(f'/api/orders/{order_id}/items/{rng.choice(items)["id"]}',
+                       json={'quantity': rng.randint(1, 4), 'version': version})
+        elif action < 0.85:
+            client.delete(f'/api/orders/{order_id}/items/{rng.choice(items)["id"]}?version={version}')
+        else:
+            client.post(f'/api/orders/{order_id}/payment', json={'payment_method': 'cash', 'version': version})
+
+
+def other_worker(db_path, seed_value, count):
+    main = load_app(db_path)
+    client = main.app.test_client()
+    client.post('/api/auth/login', json={'username': 'garson1', 'password': '1234'})
+    random_ops(client, random.Random(seed_value), count)
+
+
+def timed(client, url, count):
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        client.get(url)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix='adisyo-bench-')
+    db_path = os.path.join(tmp, 'adisyo.db')
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        seeder = ctx.Process(target=seed, args=(db_path,))
+        seeder.start()
+        seeder.join()
+
+        app_module = load_app(db_path)
+        app_module.app.config['COALESCE_TTL'] = 0
+        client = app_module.app.test_client()
+        client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+
+        rng = random.Random(11)
+        print('\n== Tutarlilik (rastgele islemler, iki surec) ==')
+        for round_no in range(ROUNDS):
+            random_ops(client, rng, OPS_PER_ROUND)
+            if round_no % 3 == 2:
+                worker = ctx.Process(target=other_worker, args=(db_path, round_no, OPS_PER_ROUND))
+                worker.start()
+                worker.join()
+            state = client.get('/api/system/live-state').get_json()['data']
+            assert state['consistent'], state
+        print(f'  {ROUNDS} tur sonunda tutarli: {state}')
+
+        print('\n== Okuma gecikmesi (p50 / p99) ==')
+        for enabled in (False, True):
+            app_module.app.config['LIVE_STATE'] = enabled
+            label = 'bellek' if enabled else 'veritabani'
+            for url in ('/api/tables', '/api/tables/1'):
+                p50, p99 = timed(client, url, READS)
+                print(f'  {label:<11} {url:<16} p50 {p50:6.3f} ms   p99 {p99:6.3f} ms')
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Rapor izolasyonu benchmark'i
+
+Gecici bir veritabaninda siparis yazma gecikmesini once tek basina, sonra
+ayri bir surecte agir raporlar (gunluk rapor, siparis gecmisi, analiz)
+surekli calisirken olcer. Raporlar salt okunur baglantidan okudugu icin
+iki olcumun yakin olmasi beklenir. Tek cekirdekli makinede iki surec CPU'yu
+paylastigi icin p50 yine de artar; kilit beklemesi p99 / max'ta gorunur.
+
+Gecme / kalma kontrolleri (biri tutmazsa cikis kodu 1):
+    - rapor baglantisi salt okunurdur (yazma denemesi reddedilir)
+    - yazma kilidi baska bir baglantida tutulurken rapor beklemeden doner
+    - acik bir rapor okumasi varken siparis yazimi beklemeden commit olur
+    - agir raporlar sirasinda hicbir yazim MAX_WRITE_MS'i asmaz (kilit
+      beklemesi busy timeout kadar surerdi)
+
+Kullanim: python benchmarks/bench_report_isolation.py
+"""
+
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+WRITES = 400
+MAX_WRITE_MS = 1000  # Kilit bekleyen yazim busy timeout'a (5 sn) takilir
+NO_WAIT_MS = 500  # Kilit beklemeden donmesi gereken islemler
+
+
+def load_app(db_path):
+    os.environ['ADISYO_DB'] = db_path
+    sys.path.insert(0, ROOT)
+    import main
+    return main
+
+
+def seed(db_path, days=90, orders_per_day=250):
+    """Gecmis siparislerle gecici veritabani olustur"""
+    main = load_app(db_path)
+    with main.app.app_context():
+        main.init_database()
+
+    random.seed(7)
+    con = sqlite3.connect(db_path)
+    start = datetime.now() - timedelta(days=days)
+    orders, items = [], []
+    order_id, item_id = 100000, 1000000
+    for day in range(days + 1):
+        for _ in range(orders_per_day):
+            order_id += 1
+            closed = start + timedelta(days=day, hours=random.randint(11, 23), minutes=random.randint(0, 59))
+            total = 0.0
+            for menu_item_id in random.sample(range(1, 26), random.randint(1, 6)):
+                item_id += 1
+                qty = random.randint(1, 3)
+                price = float(menu_item_id * 10)
+                total += qty * price
+                items.append((item_id, order_id, menu_item_id, f'Urun {menu_item_id}', price, qty))
+            orders.append((order_id, random.randint(1, 12), 'paid', str(closed), str(closed),
+                           total, total * 0.1, 0.0, total * 1.1, random.choice(['cash', 'card'])))
+    con.executemany('INSERT INTO orders (id, table_id, status, opened_at, closed_at, subtotal, tax_amount,'
+                    ' discount_amount, total, payment_method, version) VALUES (?,?,?,?,?,?,?,?,?,?,1)', orders)
+    con.executemany('INSERT INTO order_items (id, order_id, menu_item_id, name, price, quantity)'
+                    ' VALUES (?,?,?,?,?,?)', items)
+    con.commit()
+    con.close()
+    return len(orders)
+
+
+def report_worker(db_path, stop, counter):
+    main = load_app(db_path)
+    client = main.app.test_client()
+    client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    today = datetime.now().date()
+    while not stop.is_set():
+        main.analytics.clear_cache()
+        client.get(f'/api/reports/daily?date={today - timedelta(days=1)}')
+        client.get('/api/reports/orders')
+        client.get(f'/api/reports/analytics?start={today - timedelta(days=90)}&end={today}')
+        with counter.get_lock():
+            counter.value += 1
+
+
+def add_item(client, order, menu_item_id):
+    """Siparise urun ekle; guncel siparisi (yeni surumuyle) dondur"""
+    response = client.post(f'/api/orders/{order["id"]}/items',
+                           json={'menu_item_id': menu_item_id, 'quantity': 1, 'version': order['version']})
+    return response, response.get_json()['data']
+
+
+def measure_writes(client, order):
+    latencies = []
+    for i in range(WRITES):
+        started = time.perf_counter()
+        _, order = add_item(client, order, i % 25 + 1)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, order
+
+
+def timed_ms(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def check_isolation(app_module, client, admin, order, db_path):
+    """Rapor okumalari ile yazimlarin birbirini beklemedigini dogrula; hata listesi"""
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    failures = []
+    today = datetime.now().date()
+    with app_module.app.app_context():
+        try:
+            app_module.report_db.session.execute(text('CREATE TABLE isolation_probe (id INTEGER)'))
+            failures.append('rapor baglantisi yazabiliyor')
+        except OperationalError:
+            pass
+        finally:
+            app_module.report_db.session.rollback()
+
+    # Baska bir baglanti yazma kilidini tutarken rapor
+    writer = sqlite3.connect(db_path, timeout=0)
+    writer.execute('BEGIN IMMEDIATE')
+    writer.execute("UPDATE settings SET value = value WHERE key = 'tax_rate'")
+    try:
+        response, elapsed = timed_ms(lambda: admin.get(f'/api/reports/daily?date={today - timedelta(days=1)}'))
+        print(f'  Yazma kilidi tutulurken gunluk rapor: {elapsed:.1f} ms ({response.status_code})')
+        if response.status_code != 200 or elapsed > NO_WAIT_MS:
+            failures.append(f'rapor yazma kilidini bekledi ({elapsed:.0f} ms, {response.status_code})')
+    finally:
+        writer.rollback()
+        writer.close()
+
+    # Rapor okumasi yarim kalmisken (imlec acik, okuma kilidi tutuluyor) yazim
+    with app_module.app.app_context():
+        reports = app_module.report_db.session
+        reading = reports.execute(text('SELECT id FROM order_items'))
+        reading.fetchone()
+        try:
+            (response, order), elapsed = timed_ms(lambda: add_item(client, order, 1))
+            print(f'  Rapor okumasi acikken siparis yazimi: {elapsed:.1f} ms ({response.status_code})')
+            if response.status_code != 200 or elapsed > NO_WAIT_MS:
+                failures.append(f'yazim rapor okumasini bekledi ({elapsed:.0f} ms, {response.status_code})')
+        finally:
+            reading.close()
+            reports.rollback()
+    return failures, order
+
+
+def summary(label, latencies):
+    latencies = sorted(latencies)
+    p = lambda q: latencies[int(q * (len(latencies) - 1))]
+    print(f'  {label:<22} p50 {p(0.5):6.2f} ms   p95 {p(0.95):6.2f} ms   '
+          f'p99 {p(0.99):6.2f} ms   max {latencies[-1]:7.2f} ms')
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix='adisyo-bench-')
+    db_path = os.path.join(tmp, 'adisyo.db')
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        seeder = ctx.Process(target=seed, args=(db_path,))
+        seeder.start()
+        seeder.join()
+
+        app_module = load_app(db_path)
+        client = app_module.app.test_client()
+        client.post('/api/auth/login', json={'username': 'garson1', 'password': '1234'})
+        order = client.post('/api/tables/1/open').get_json()['data']
+
+        print('\n== Kilit izolasyonu ==')
+        admin = app_module.app.test_client()
+        admin.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+        failures, order = check_isolation(app_module, client, admin, order, db_path)
+
+        print(f'\n== Yazma gecikmesi (siparise urun ekleme, {os.cpu_count()} CPU) ==')
+        baseline, order = measure_writes(client, order)
+        summary('rapor yokken', baseline)
+
+        stop, counter = ctx.Event(), ctx.Value('i', 0)
+        worker = ctx.Process(target=report_worker, args=(db_path, stop, counter))
+        worker.start()
+        time.sleep(3)  # Rapor sureci isinsin
+
+        loaded, order = measure_writes(client, order)
+        stop.set()
+        worker.join()
+        summary('agir raporlar sirasinda', loaded)
+        print(f'  Ayni surede tamamlanan rapor turu: {counter.value}')
+        print(f'  p50 farki: {statistics.median(loaded) - statistics.median(baseline):+.2f} ms')
+        if max(loaded) > MAX_WRITE_MS:
+            failures.append(f'agir raporlar sirasinda yazim {max(loaded):.0f} ms surdu (sinir {MAX_WRITE_MS} ms)')
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f'  KALDI: {failure}')
+        sys.exit(1)
+    print('  GECTI: raporlar yazimlari bekletmiyor')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Yanit katmani benchmark'i
+
+Aksam servisi masa panosu (/api/tables) ve gunluk rapor (/api/reports/daily)
+buyuklugundeki veriler icin serilestirme suresini ve agdaki boyutu olcer.
+
+Kullanim: python benchmarks/bench_responses.py
+"""
+
+import gzip
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from responses import brotli, orjson  # noqa: E402
+
+MENU = [('Adana Kebap', 220), ('Urfa Kebap', 200), ('Karisik Izgara', 450),
+        ('Lahmacun', 80), ('Pide (Kasarli)', 120), ('Iskender', 280),
+        ('Ayran', 30), ('Kola', 40), ('Salgam', 35), ('Su', 15), ('Cay', 20),
+        ('Kunefe', 150), ('Baklava', 120), ('Mercimek Corbasi', 60), ('Ezme', 50)]
+
+
+def make_order(order_id, table_id, item_count, opened_at, paid=False):
+    items = []
+    for i in range(item_count):
+        name, price = MENU[(order_id + i) % len(MENU)]
+        items.append({
+            'id': order_id * 100 + i,
+            'menu_item_id': (order_id + i) % len(MENU) + 1,
+            'name': name,
+            'price': float(price),
+            'quantity': 1 + i % 3,
+            'note': 'acisiz' if i % 5 == 0 else '',
+            'is_printed': True,
+        })
+    subtotal = sum(it['price'] * it['quantity'] for it in items)
+    return {
+        'id': order_id,
+        'table_id': table_id,
+        'table_name': f'Masa {table_id}',
+        'status': 'paid' if paid else 'open',
+        'opened_at': opened_at.isoformat(),
+        'closed_at': (opened_at + timedelta(minutes=75)).isoformat() if paid else None,
+        'subtotal': subtotal,
+        'tax_rate': 10.0,
+        'tax_amount': subtotal * 0.1,
+        'discount_amount': 0.0,
+        'discount_type': None,
+        'total': subtotal * 1.1,
+        'payment_method': 'card' if paid and order_id % 2 else ('cash' if paid else None),
+        'items': items,
+    }
+
+
+def table_board(table_count=60, items_per_order=14):
+    """Tum masalar dolu, her masada acik siparis"""
+    now = datetime.now()
+    data = []
+    for t in range(1, table_count + 1):
+        data.append({
+            'id': t,
+            'name': f'Masa {t}',
+            'capacity': 4,
+            'status': 'occupied',
+            'opened_at': now.isoformat(),
+            'order': make_order(t, t, items_per_order, now),
+        })
+    return {'success': True, 'data': data}
+
+
+def daily_report(order_count=600, items_per_order=8):
+    start = datetime.now().replace(hour=11, minute=0)
+    orders = [make_order(i, i % 60 + 1, items_per_order,
+                         start + timedelta(minutes=i), paid=True)
+              for i in range(1, order_count + 1)]
+    total = sum(o['total'] for o in orders)
+    return {'success': True, 'data': {
+        'date': start.date().isoformat(),
+        'total_revenue': total,
+        'total_orders': len(orders),
+        'average_order': total / len(orders),
+        'top_items': [{'name': n, 'qty': 10, 'revenue': p * 10.0} for n, p in MENU[:10]],
+        'orders': orders,
+    }}
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def bench(label, payload, number=50):
+    print(f'\n== {label} ==')
+    encoders = [('json (stdlib)', stdlib_dumps)]
+    if orjson is not None:
+        encoders.append(('orjson', lambda o: orjson.dumps(o, option=orjson.OPT_NON_STR_KEYS)))
+
+    body = None
+    for name, fn in encoders:
+        seconds = timeit.timeit(lambda: fn(payload), number=number) / number
+        body = fn(payload)
+        print(f'  {name:<14} {seconds * 1000:8.2f} ms')
+
+    print(f'  {"ham":<14} {len(body):8d} bayt')
+    gz = gzip.compress(body, compresslevel=6)
+    print(f'  {"gzip (6)":<14} {len(gz):8d} bayt')
+    if brotli is not None:
+        br = brotli.compress(body, quality=4)
+        print(f'  {"brotli (4)":<14} {len(br):8d} bayt')
+
+
+if __name__ == '__main__':
+    bench('Masa panosu (60 masa x 14 kalem)', table_board())
+    bench('Gunluk rapor (600 siparis x 8 kalem)', daily_report(), number=10)
@@ -0,0 +1,81 @@
+"""
+Acilis suresi benchmark'i
+
+Gecici bir veritabaniyla uygulamayi ayri surecte tekrar tekrar baslatir ve
+surec baslangicindan ilk /api/tables yanitina kadar gecen sureyi olcer
+(import, prepare_app, ilk istek). Iki durum karsilastirilir:
+
+    kurulum:        sema parmak izi yok (eski davranis: create_all, kolon
+                    kontrolu, varsayilan veri sorgulari her acilista)
+    parmak izi:     kayitli parmak izi tutuyor, kurulum atlaniyor
+
+Hedef: servis sirasinda cokmeden sonra tabletlerin bir saniye icinde
+tekrar calismasi.
+
+Kullanim: python benchmarks/bench_startup.py
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+RUNS = 7
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+app = main.prepare_app()
+created = time.perf_counter()
+client = app.test_client()
+client.post('/api/auth/login', json={{'username': 'garson1', 'password': '1234'}})
+assert client.get('/api/tables').status_code == 200
+served = time.perf_counter()
+print(json.dumps({{'import': imported - started, 'prepare_app': created - imported,
+                  'first_request': served - created}}))
+"""
+
+
+def start_once(db_path, reset_fingerprint):
+    if reset_fingerprint:
+        con = sqlite3.connect(db_path)
+        con.execute('PRAGMA user_version = 0')
+        con.close()
+    env = dict(os.environ, ADISYO_DB=db_path)
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', CHILD.format(root=ROOT)], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - started
+    return {**json.loads(out.strip().splitlines()[-1]), 'total': total}
+
+
+def report(label, runs):
+    medians = {key: statistics.median(r[key] for r in runs) * 1000 for key in runs[0]}
+    print(f"  {label:<12} import {medians['import']:6.0f} ms   prepare_app {medians['prepare_app']:5.1f} ms   "
+          f"ilk istek {medians['first_request']:5.1f} ms   toplam {medians['total']:6.0f} ms")
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix='adisyo-bench-')
+    db_path = os.path.join(tmp, 'adisyo.db')
+    try:
+        first = start_once(db_path, False)
+        print(f'\n== Acilis suresi (medyan, {RUNS} tekrar) ==')
+        print(f"  ilk kurulum  toplam {first['total'] * 1000:6.0f} ms")
+        report('kurulum', [start_once(db_path, True) for _ in range(RUNS)])
+        report('parmak izi', [start_once(db_path, False) for _ in range(RUNS)])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
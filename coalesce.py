@@ -0,0 +1,100 @@
+"""
+Adisyo POS Sistemi - Istek Birlestirme (single-flight)
+Ayni anda gelen ayni okuma istekleri tek bir hesaplamayi paylasir; sonuc
+kisa bir sure (mikro onbellek) daha kullanilir. Her veritabani commit'i
+nesli (generation) artirir: commit'ten sonra gelen istekler eski sonuca
+katilmaz, yani bir yazimdan sonraki okuma her zaman guncel veriyi gorur.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'expires')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.expires = None
+
+
+class SingleFlight:
+    """Anahtar bazinda tek hesaplama + mikro onbellek"""
+
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = defaultdict(lambda: {'computed': 0, 'joined': 0, 'cached': 0})
+
+    def invalidate(self):
+        """Yeni nesle gec; bekleyen ve onbellekteki sonuclar yeni isteklere verilmez"""
+        with self._lock:
+            self.generation += 1
+            self._flights.clear()
+
+    def do(self, name, key, compute, ttl=0.5, cacheable=None):
+        """compute() sonucunu ayni anahtarli isteklerle paylas.
+
+        name: istatistik grubu (uc adi)
+        cacheable(sonuc): False ise sonuc sadece o an bekleyenlere verilir
+        """
+        now = time.monotonic()
+        with self._lock:
+            key = (self.generation, name, key)
+            flight = self._flights.get(key)
+            if flight is not None and flight.expires is not None and flight.expires <= now:
+                del self._flights[key]
+                flight = None
+
+            stats = self._stats[name]
+            if flight is None:
+                if len(self._flights) >= self.MAX_ENTRIES:
+                    self._prune(now)
+                flight = self._flights[key] = _Flight()
+                stats['computed'] += 1
+                leader = True
+            else:
+                stats['cached' if flight.done.is_set() else 'joined'] += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            keep = flight.error is None and ttl > 0 and (cacheable is None or cacheable(flight.result))
+            with self._lock:
+                if keep:
+                    flight.expires = time.monotonic() + ttl
+                elif self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _prune(self, now):
+        expired = [k for k, f in self._flights.items() if f.expires is not None and f.expires <= now]
+        for k in expired:
+            del self._flights[k]
+
+    def stats(self):
+        """Uc bazinda hesaplanan / paylasilan istek sayilari"""
+        with self._lock:
+            result = {}
+            for name, s in self._stats.items():
+                saved = s['joined'] + s['cached']
+                total = s['computed'] + saved
+                result[name] = {**s, 'saved': saved, 'saved_ratio': saved / total if total else 0.0}
+            return result
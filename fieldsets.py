@@ -0,0 +1,191 @@
+"""
+Adisyo POS Sistemi - Secilebilir Alanlar (sparse fieldsets)
+Liste uclari ?fields= ve ?include= parametreleriyle sadece istenen alanlari
+dondurur. Istenmeyen alanlarin kolonlari sorguya girmez, istenmeyen
+iliskiler hic yuklenmez.
+
+    ?fields=id,status,order.total     -> kok ve ic ice kaynak alanlari
+    ?include=order,order.items        -> acilacak iliskiler
+
+Hic parametre verilmezse kaynagin tam (eski) ciktisi uretilir. Sadece
+fields verilirse sadece orada adi gecen iliskiler acilir. 'id' her zaman
+doner.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+
+class FieldsetError(ValueError):
+    pass
+
+
+class Computed:
+    """Kolon olmayan alan.
+
+    getter: obj -> deger
+    columns: getter'in okudugu kolonlar
+    joins: {iliski adi: (hedef kolonlar)}; tek sorguda join ile yuklenir
+    """
+
+    def __init__(self, getter, columns=(), joins=None):
+        self.getter = getter
+        self.columns = tuple(columns)
+        self.joins = joins or {}
+
+
+class Resource:
+    """Bir modelin disariya acilan alanlari ve iliskileri.
+
+    fields: alan adlari (cikti sirasi); kolon olmayanlar computed'da tanimlanir
+    relations: {ad: (Resource, model iliski adi)}; iliski adi None ise
+        uc degeri kendisi doldurur
+    default_include: parametre verilmezse acilan iliskiler (noktali yol)
+    optional: tam ciktida olmayan, sadece acikca istenince donen alanlar
+    """
+
+    def __init__(self, model, fields, computed=None, relations=None, default_include=(), optional=()):
+        self.model = model
+        self.fields = list(fields)
+        self.optional = list(optional)
+        self.computed = computed or {}
+        self.relations = relations or {}
+        self.default_include = tuple(default_include)
+
+
+class Selection:
+    """Bir istekte secilen alanlar ve iliskiler"""
+    __slots__ = ('resource', 'fields', 'relations')
+
+    def __init__(self, resource, fields, relations):
+        self.resource = resource
+        self.fields = fields
+        self.relations = relations
+
+    def __contains__(self, name):
+        return name in self.fields or name in self.relations
+
+
+def _split(value):
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def select(resource, fields=None, include=None):
+    """?fields / ?include degerlerinden secim olustur"""
+    field_paths = _split(fields)
+    include_paths = _split(include)
+    if include_paths is None:
+        include_paths = list(resource.default_include) if field_paths is None else []
+    return _build(resource, field_paths, include_paths, '')
+
+
+def _build(resource, fields, includes, path):
+    relation_names = []
+
+    def want(name, full):
+        if name not in resource.relations:
+            raise FieldsetError(f'Bilinmeyen iliski: {full}')
+        if name not in relation_names:
+            relation_names.append(name)
+
+    for inc in includes:
+        want(inc.split('.', 1)[0], path + inc)
+
+    own = None
+    if fields is not None:
+        own = []
+        for f in fields:
+            head = f.split('.', 1)[0]
+            if '.' in f or head in resource.relations:
+                want(head, path + f)
+            elif f in resource.fields or f in resource.optional:
+                own.append(f)
+            else:
+                raise FieldsetError(f'Bilinmeyen alan: {path + f}')
+
+    if own is None:
+        selected = list(resource.fields)
+    else:
+        selected = [f for f in resource.fields + resource.optional if f == 'id' or f in own]
+
+    relations = {}
+    for name in relation_names:
+        prefix = name + '.'
+        sub_fields = None
+        if fields is not None:
+            nested = [f[len(prefix):] for f in fields if f.startswith(prefix)]
+            sub_fields = nested or None
+        sub_includes = [i[len(prefix):] for i in includes if i.startswith(prefix)]
+        relations[name] = _build(resource.relations[name][0], sub_fields, sub_includes, path + prefix)
+
+    return Selection(resource, selected, relations)
+
+
+def _columns(model, names):
+    return [getattr(model, name) for name in names]
+
+
+def query_options(selection):
+    """Secime gore load_only ve eager load secenekleri"""
+    resource = selection.resource
+    model = resource.model
+    columns, joins = set(), {}
+    for name in selection.fields:
+        computed = resource.computed.get(name)
+        if computed is None:
+            columns.add(name)
+            continue
+        columns.update(computed.columns)
+        for rel, rel_columns in computed.joins.items():
+            joins.setdefault(rel, set()).update(rel_columns)
+
+    options = [load_only(*_columns(model, sorted(columns)))]
+    for rel, rel_columns in joins.items():
+        attr = getattr(model, rel)
+        target = attr.property.mapper.class_
+        options.append(joinedload(attr).load_only(*_columns(target, sorted(rel_columns))))
+
+    for name, sub in selection.relations.items():
+        attr_name = resource.relations[name][1]
+        if attr_name is None:
+            continue
+        options.append(selectinload(getattr(model, attr_name)).options(*query_options(sub)))
+    return options
+
+
+def serialize(obj, selection):
+    """Nesneyi sadece secilen alanlarla sozluge cevir"""
+    resource = selection.resource
+    data = {}
+    for name in selection.fields:
+        computed = resource.computed.get(name)
+        value = computed.getter(obj) if computed else getattr(obj, name)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        data[name] = value
+
+    for name, sub in selection.relations.items():
+        attr_name = resource.relations[name][1]
+        if attr_name is None:
+            continue  # Uc kendisi dolduruyor
+        value = getattr(obj, attr_name)
+        if isinstance(value, list):
+            data[name] = [serialize(v, sub) for v in value]
+        else:
+            data[name] = serialize(value, sub) if value is not None else None
+    return data
+
+
+def project(data, selection):
+    """Hazir (tam) sozlukten sadece secilen alanlari al; bellekten okunan veriler icin"""
+    result = {name: data[name] for name in selection.fields}
+    for name, sub in selection.relations.items():
+        value = data.get(name)
+        if isinstance(value, list):
+            result[name] = [project(v, sub) for v in value]
+        else:
+            result[name] = project(value, sub) if value is not None else None
+    return result
@@ -0,0 +1,204 @@
+"""
+Adisyo POS Sistemi - Siparis Olay Gunlugu
+Siparis degisiklikleri (urun ekleme, miktar degisikligi, silme, indirim,
+odeme, iptal) sadece eklenen bir olay tablosuna yazilir. Yazimlar istek
+icinde yapilmaz; arka plandaki JournalWriter olaylari biriktirip tek
+transaction ile toplu yazar (group commit). replay() olaylardan siparis
+durumunu, rollup() gunluk ozetleri yeniden kurar.
+"""
+
+import atexit
+import json
+import threading
+from collections import defaultdict
+
+
+EVENT_TYPES = (
+    'opened',
+    'item_added',
+    'quantity_changed',
+    'note_changed',
+    'item_removed',
+    'discount_applied',
+    'paid',
+    'cancelled',
+)
+
+
+class JournalWriter:
+    """Olaylari biriktirip arka planda toplu yazan yazici.
+
+    flush_interval saniyede bir ya da max_batch olay biriktiginde tek bir
+    INSERT (executemany) ile yazar. Surec cokerse en fazla flush_interval
+    kadar olay kaybolabilir; normal kapanista kuyruk bosaltilir.
+    """
+
+    def __init__(self, table, flush_interval=0.2, max_batch=500):
+        self.table = table
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.engine = None
+        self.written = 0
+        self.batches = 0
+        self._pending = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def start(self, engine):
+        """Yaziciyi veritabanina bagla ve arka plan is parcacigini baslat"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self.engine = engine
+            self._thread = threading.Thread(target=self._run, name='order-journal', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def extend(self, events):
+        if not events:
+            return
+        with self._cond:
+            self._pending.extend(events)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def flush(self):
+        """Bekleyen olaylari hemen yaz"""
+        self._write_pending()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pending) >= self.max_batch,
+                                    timeout=self.flush_interval)
+            try:
+                self._write_pending()
+            except Exception as e:
+                print(f"Olay gunlugu yazma hatasi: {e}")
+
+    def _write_pending(self):
+        # Kuyrugu alma ve yazma ayni kilit altinda; olay sirasi korunur
+        with self._write_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch or self.engine is None:
+                with self._cond:
+                    self._pending[:0] = batch
+                return
+
+            rows = [{**event, 'payload': json.dumps(event.get('payload') or {})} for event in batch]
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(self.table.insert(), rows)
+            except Exception:
+                # Olaylari kaybetmemek icin kuyrugun basina geri koy
+                with self._cond:
+                    self._pending[:0] = batch
+                raise
+            self.written += len(rows)
+            self.batches += 1
+
+
+def _totals(order):
+    subtotal = sum(line['price'] * line['quantity'] for line in order['items'].values())
+    tax_amount = subtotal * (order['tax_rate'] / 100)
+    order['subtotal'] = subtotal
+    order['tax_amount'] = tax_amount
+    if order['status'] == 'open':
+        order['total'] = subtotal + tax_amount - order['discount_amount']
+
+
+def _new_order(event):
+    return {
+        'id': event['order_id'],
+        'table_id': event['table_id'],
+        'user_id': event['user_id'],
+        'status': 'open',
+        'opened_at': event['created_at'],
+        'closed_at': None,
+        'tax_rate': 10.0,
+        'subtotal': 0.0,
+        'tax_amount': 0.0,
+        'discount_type': None,
+        'discount_amount': 0.0,
+        'total': 0.0,
+        'payment_method': None,
+        'items': {},
+    }
+
+
+def apply_event(orders, event):
+    """Tek olayi siparis durumlarina uygula"""
+    payload = event['payload']
+    order = orders.get(event['order_id'])
+    if order is None:
+        order = orders[event['order_id']] = _new_order(event)
+
+    kind = event['event_type']
+    items = order['items']
+    if kind == 'opened':
+        order['tax_rate'] = payload.get('tax_rate', order['tax_rate'])
+    elif kind == 'item_added':
+        line = items.get(payload['item_id'])
+        if line:
+            line['quantity'] += payload['quantity']
+        else:
+            items[payload['item_id']] = {
+                'id': payload['item_id'],
+                'menu_item_id': payload['menu_item_id'],
+                'name': payload['name'],
+                'price': payload['price'],
+                'quantity': payload['quantity'],
+                'note': payload.get('note', ''),
+            }
+    elif kind == 'quantity_changed':
+        if payload['item_id'] in items:
+            items[payload['item_id']]['quantity'] = payload['quantity']
+    elif kind == 'note_changed':
+        if payload['item_id'] in items:
+            items[payload['item_id']]['note'] = payload['note']
+    elif kind == 'item_removed':
+        items.pop(payload['item_id'], None)
+    elif kind == 'discount_applied':
+        order['discount_type'] = payload['discount_type']
+        order['discount_amount'] = payload['discount_amount']
+    elif kind == 'paid':
+        order['status'] = 'paid'
+        order['closed_at'] = event['created_at']
+        order['payment_method'] = payload.get('payment_method')
+        order['total'] = payload['total']
+    elif kind == 'cancelled':
+        order['status'] = 'cancelled'
+        order['closed_at'] = event['created_at']
+
+    _totals(order)
+    return order
+
+
+def replay(events, order_id=None):
+    """Olaylardan siparis durumlarini yeniden kur: {order_id: siparis}"""
+    orders = {}
+    for event in events:
+        if order_id is None or event['order_id'] == order_id:
+            apply_event(orders, event)
+    return orders
+
+
+def rollup(events):
+    """Olaylardan gunluk ozet: ciro, siparis sayisi ve urun adetleri"""
+    orders = replay(events)
+    days = defaultdict(lambda: {'revenue': 0.0, 'orders': 0, 'cancelled': 0,
+                                'items': defaultdict(int)})
+    for order in orders.values():
+        if order['closed_at'] is None:
+            continue
+        day = days[order['closed_at'][:10]]  # ISO metnin tarih kismi
+        if order['status'] == 'cancelled':
+            day['cancelled'] += 1
+            continue
+        day['revenue'] += order['total']
+        day['orders'] += 1
+        for line in order['items'].values():
+            day['items'][line['name']] += line['quantity']
+    return {d: {**v, 'items': dict(v['items'])} for d, v in sorted(days.items())}
@@ -0,0 +1,116 @@
+"""
+Adisyo POS Sistemi - Mutfak Fis Gecikmesi
+Siparis kalemlerinin zaman damgalarindan (eklenme, fise gonderilme, yazici
+onayi, servis) reyon, yazici ve saat bazinda gecikme yuzdeliklerini
+hesaplar. Aralik tek sorguyla okunur; gruplama ve yuzdelikler bellekte.
+
+    dispatch: eklenme -> fisin yaziciya gonderilmesi
+    print:    eklenme -> yazicinin basariyla basmasi
+    printer:  gonderilme -> basma (yazicinin kendi gecikmesi)
+    serve:    eklenme -> servis
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+
+METRICS = ('dispatch', 'print', 'printer', 'serve')
+PERCENTILES = (50, 90, 95)
+
+LATENCY_SQL = text("""
+    SELECT oi.station_id,
+           s.name,
+           oi.printer_id,
+           p.name,
+           CAST(strftime('%H', oi.created_at) AS INTEGER),
+           (julianday(oi.print_sent_at) - julianday(oi.created_at)) * 86400,
+           (julianday(oi.printed_at) - julianday(oi.created_at)) * 86400,
+           (julianday(oi.printed_at) - julianday(oi.print_sent_at)) * 86400,
+           (julianday(oi.served_at) - julianday(oi.created_at)) * 86400
+    FROM order_items oi
+    LEFT JOIN stations s ON s.id = oi.station_id
+    LEFT JOIN printers p ON p.id = oi.printer_id
+    WHERE oi.created_at >= :start
+      AND oi.created_at < :end
+""")
+
+
+def percentile(values, q):
+    """Sirali listede en yakin sira yuzdeligi"""
+    index = max(0, -(-len(values) * q // 100) - 1)
+    return values[int(index)]
+
+
+def summarize(values):
+    """Bir metrigin sayisi, yuzdelikleri ve en buyugu (saniye)"""
+    if not values:
+        return {'count': 0, **{f'p{q}': None for q in PERCENTILES}, 'max': None}
+    values = sorted(values)
+    result = {'count': len(values)}
+    for q in PERCENTILES:
+        result[f'p{q}'] = round(percentile(values, q), 1)
+    result['max'] = round(values[-1], 1)
+    return result
+
+
+class _Group:
+    __slots__ = ('info', 'lines', 'samples')
+
+    def __init__(self, info):
+        self.info = info
+        self.lines = 0
+        self.samples = {metric: [] for metric in METRICS}
+
+    def add(self, latencies):
+        self.lines += 1
+        for metric, value in zip(METRICS, latencies):
+            # Negatif deger: saat geri alinmis; olcum disi
+            if value is not None and value >= 0:
+                self.samples[metric].append(value)
+
+    def to_dict(self):
+        return {**self.info, 'line_count': self.lines,
+                **{metric: summarize(values) for metric, values in self.samples.items()}}
+
+
+def compute(session, start, end):
+    """[start, end) araliginda eklenen kalemlerin gecikme ozetleri"""
+    overall = _Group({})
+    stations, printers, hours = {}, {}, {}
+
+    # Kolonlarla ayni metin bicimi (YYYY-AA-GG SS:DD:ss.ffffff)
+    for row in session.execute(LATENCY_SQL, {'start': str(start), 'end': str(end)}):
+        station_id, station_name, printer_id, printer_name, hour = row[:5]
+        latencies = row[5:]
+        overall.add(latencies)
+        if station_id is not None:
+            group = stations.get(station_id)
+            if group is None:
+                group = stations[station_id] = _Group({'station_id': station_id, 'station_name': station_name})
+            group.add(latencies)
+        if printer_id is not None:
+            group = printers.get(printer_id)
+            if group is None:
+                group = printers[printer_id] = _Group({'printer_id': printer_id, 'printer_name': printer_name})
+            group.add(latencies)
+        group = hours.get(hour)
+        if group is None:
+            group = hours[hour] = _Group({'hour': hour})
+        group.add(latencies)
+
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'line_count': overall.lines,
+        'overall': overall.to_dict(),
+        'stations': [stations[k].to_dict() for k in sorted(stations)],
+        'printers': [printers[k].to_dict() for k in sorted(printers)],
+        'hours': [hours[k].to_dict() for k in sorted(hours)],
+    }
+
+
+def day_range(start_date, end_date):
+    """Gun araligini (her iki gun dahil) datetime araligina cevir"""
+    return (datetime.combine(start_date, datetime.min.time()),
+            datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
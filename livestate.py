@@ -0,0 +1,228 @@
+"""
+Adisyo POS Sistemi - Canli Durum (acik masalar bellekte)
+Masalar, acik siparisler ve kalemleri __slots__ nesneleri olarak bellekte
+tutulur. Okumalar (masa listesi, masa detayi, siparis yanitlari) veritabanina
+gitmez. Yazimlar once SQLite'a yapilir; ayni transaction icinde degisen
+satirlar tekrar okunur ve commit'ten sonra bellege uygulanir (write-through).
+
+Her uygulanan durum change_log sira numarasiyla (applied_seq) isaretlenir.
+Baska bir surec (worker) yazdiysa sira numarasi ilerlemis olur; o zaman
+sadece degisen satirlar veritabanindan yeniden okunur.
+"""
+
+import threading
+
+
+TABLE_FIELDS = ('id', 'name', 'capacity', 'status', 'opened_at')
+ORDER_FIELDS = ('id', 'table_id', 'status', 'opened_at', 'closed_at', 'subtotal', 'tax_rate',
+                'tax_amount', 'discount_amount', 'discount_type', 'total', 'payment_method',
+                'user_id', 'version')
+LINE_FIELDS = ('id', 'order_id', 'menu_item_id', 'name', 'price', 'quantity', 'note', 'is_printed',
+               'created_at', 'print_sent_at', 'printed_at', 'served_at')
+
+# change_log varlik adlari
+ENTITIES = ('tables', 'orders', 'order_items')
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+class LiveTable:
+    __slots__ = TABLE_FIELDS
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'capacity': self.capacity,
+            'status': self.status,
+            'opened_at': _iso(self.opened_at)
+        }
+
+
+class LiveLine:
+    __slots__ = LINE_FIELDS
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'menu_item_id': self.menu_item_id,
+            'name': self.name,
+            'price': self.price,
+            'quantity': self.quantity,
+            'note': self.note,
+            'is_printed': self.is_printed,
+            'created_at': _iso(self.created_at),
+            'print_sent_at': _iso(self.print_sent_at),
+            'printed_at': _iso(self.printed_at),
+            'served_at': _iso(self.served_at)
+        }
+
+
+class LiveOrder:
+    __slots__ = ORDER_FIELDS + ('lines',)
+
+    def __init__(self):
+        self.lines = {}  # kalem id -> LiveLine
+
+
+def _fill(obj, fields, row):
+    for field in fields:
+        setattr(obj, field, row[field])
+    return obj
+
+
+class LiveState:
+    """Acik masalarin bellek ici kopyasi"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.ready = False
+        self.applied_seq = 0
+        self.tables = {}
+        self.orders = {}      # sadece acik siparisler
+        self._line_order = {}  # kalem id -> siparis id
+
+    def load(self, seq, tables, orders, lines):
+        """Tum durumu bastan kur (satirlar sozluk)"""
+        with self._lock:
+            self.tables = {}
+            self.orders = {}
+            self._line_order = {}
+            self._apply({'tables': {r['id']: r for r in tables},
+                         'orders': {r['id']: r for r in orders},
+                         'order_items': {r['id']: r for r in lines}})
+            self.applied_seq = seq
+            self.ready = True
+
+    def apply(self, rows, first_seq, last_seq):
+        """[first_seq, last_seq] araligindaki degisiklikleri uygula.
+
+        rows: {varlik: {id: satir ya da None (silindi)}}. Sadece araligin hemen
+        oncesi uygulanmissa (bosluk yoksa) uygulanir; aksi halde False doner ve
+        eksik kalan degisiklikler bir sonraki esitlemede veritabanindan okunur.
+        """
+        with self._lock:
+            if not self.ready or self.applied_seq != first_seq - 1:
+                return False
+            self._apply(rows)
+            self.applied_seq = last_seq
+            return True
+
+    def catch_up(self, rows, from_seq, last_seq):
+        """Veritabanindan yeniden okunan satirlari uygula.
+
+        Satirlar kilit disinda okunur; okuma sirasinda applied_seq from_seq'ten
+        ilerlediyse (ornegin bu surecin bir commit'i uygulandiysa) satirlar
+        eskimis olabilir. Bu durumda hicbir sey uygulanmaz ve False doner;
+        bir sonraki esitleme yeniden okur.
+        """
+        with self._lock:
+            if not self.ready or self.applied_seq != from_seq:
+                return False
+            self._apply(rows)
+            self.applied_seq = last_seq
+            return True
+
+    def _apply(self, rows):
+        for table_id, row in rows.get('tables', {}).items():
+            if row is None:
+                self.tables.pop(table_id, None)
+            else:
+                self.tables[table_id] = _fill(LiveTable(), TABLE_FIELDS, row)
+
+        for order_id, row in rows.get('orders', {}).items():
+            if row is None or row['status'] != 'open':
+                order = self.orders.pop(order_id, None)
+                if order is not None:
+                    for line_id in order.lines:
+                        self._line_order.pop(line_id, None)
+                continue
+            order = self.orders.get(order_id) or LiveOrder()
+            self.orders[order_id] = _fill(order, ORDER_FIELDS, row)
+
+        for line_id, row in rows.get('order_items', {}).items():
+            old_order = self.orders.get(self._line_order.pop(line_id, None))
+            if old_order is not None:
+                old_order.lines.pop(line_id, None)
+            if row is None:
+                continue
+            order = self.orders.get(row['order_id'])
+            if order is not None:  # Kapali siparislerin kalemleri tutulmaz
+                order.lines[line_id] = _fill(LiveLine(), LINE_FIELDS, row)
+                self._line_order[line_id] = order.id
+
+    # ---- Okuma ----
+
+    def order_dict(self, order_id):
+        """Order.to_dict() ile ayni cikti; siparis acik degilse None"""
+        with self._lock:
+            order = self.orders.get(order_id)
+            return self._order_dict(order) if order is not None else None
+
+    def _order_dict(self, order):
+        table = self.tables.get(order.table_id)
+        return {
+            'id': order.id,
+            'table_id': order.table_id,
+            'table_name': table.name if table else None,
+            'status': order.status,
+            'opened_at': _iso(order.opened_at),
+            'closed_at': _iso(order.closed_at),
+            'subtotal': order.subtotal,
+            'tax_rate': order.tax_rate,
+            'tax_amount': order.tax_amount,
+            'discount_amount': order.discount_amount,
+            'discount_type': order.discount_type,
+            'total': order.total,
+            'payment_method': order.payment_method,
+            'version': order.version,
+            'items': [order.lines[i].to_dict() for i in sorted(order.lines)]
+        }
+
+    def _open_orders_by_table(self):
+        by_table = {}
+        for order_id in sorted(self.orders):
+            order = self.orders[order_id]
+            by_table.setdefault(order.table_id, order)
+        return by_table
+
+    def open_order_id(self, table_id):
+        with self._lock:
+            order = self._open_orders_by_table().get(table_id)
+            return order.id if order is not None else None
+
+    def table_dict(self, table_id):
+        """Masa ve acik siparisi (/api/tables/<id> ciktisi); masa yoksa None"""
+        with self._lock:
+            table = self.tables.get(table_id)
+            if table is None:
+                return None
+            order = self._open_orders_by_table().get(table_id)
+            return {**table.to_dict(), 'order': self._order_dict(order) if order else None}
+
+    def tables_list(self):
+        """Tum masalar, acik siparisleri ve kalem sayilariyla"""
+        with self._lock:
+            by_table = self._open_orders_by_table()
+            result = []
+            for table_id in sorted(self.tables):
+                order = by_table.get(table_id)
+                data = self.tables[table_id].to_dict()
+                if order is not None:
+                    data['order'] = {**self._order_dict(order), 'item_count': len(order.lines)}
+                else:
+                    data['order'] = None
+                result.append(data)
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'applied_seq': self.applied_seq,
+                'tables': len(self.tables),
+                'open_orders': len(self.orders),
+                'lines': len(self._line_order)
+            }
@@ -3,12 +3,36 @@ Adisyo POS Sistemi - Python Backend
 Flask + SQLite + SQLAlchemy tabanlı REST API
 """
 
-from flask import Flask, jsonify, request, send_from_directory, session, render_template
+from flask import Flask, abort, jsonify, make_response, request, send_from_directory, session, render_template, has_request_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from sqlalchemy import case, event, func
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime, timedelta
 from functools import wraps
+import click
+import csv
+import hashlib
+import json
 import os
+import socket
+import threading
+import time
+
+import analytics
+import assets
+import backups
+import coalesce
+import fieldsets
+import journal
+import latency
+import livestate
+import menu_io
+import reporting
+import reservations
+import scheduler
+import responses
+import search
 
 # Flask App Setup
 app = Flask(__name__, 
@@ -17,14 +41,55 @@ app = Flask(__name__,
             template_folder='templates')
 app.secret_key = 'adisyo-secret-key-2024'
 CORS(app, supports_credentials=True)
+responses.init_app(app)
+assets.init_app(app)
 
 # Database Setup
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'adisyo.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.environ.get('ADISYO_DB', os.path.join(basedir, 'adisyo.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['REPORTS_MAX_STALENESS'] = 0  # Saniye; 0 = ayni dosyadan WAL anlik okuma
+app.config['CHANGE_LOG_RETENTION'] = 20000  # Saklanan son degisiklik sayisi
+app.config['COALESCE_TTL'] = 0.5  # Saniye; ayni GET sonucunun paylasildigi sure
+app.config['LIVE_STATE'] = True  # Acik masalari bellekten oku
+app.config['RESERVATION_DEFAULT_MINUTES'] = 120
+app.config['RESERVATION_MAX_MINUTES'] = 720
+app.config['RESERVATION_HOLD_MINUTES'] = 60  # Yaklasan rezervasyon uyarisi / bos masa tutma suresi
+app.config['BACKUP_INTERVAL'] = 3600  # Saniye; 0 = zamanlanmis yedek yok
+app.config['BACKUP_KEEP'] = 24  # Saklanan yedek sayisi
+app.config['BACKUP_COMPRESS'] = True
+app.config['SCHEDULER_ENABLED'] = True
+app.config['SCHEDULE'] = {  # Cron ifadeleri; gece servis disi saatler
+    'nightly-close': '30 4 * * *',
+    'stale-orders': '0 5 * * *',
+    'optimize': '45 4 * * *',
+    'analyze': '0 5 * * 1',
+    'incremental-vacuum': '15 5 * * *',
+}
+app.config['SCHEDULER_IDLE_SECONDS'] = 60  # Bu kadar istek gelmezse sunucu bosta sayilir
+app.config['STALE_ORDER_HOURS'] = 18  # Bu kadar acik kalan bos siparisler iptal edilir
+app.config['VACUUM_PAGES'] = 2000  # Bir calismada bosaltilan en fazla sayfa
+app.config['JOB_TIMEOUT_MINUTES'] = 120  # Bu kadar 'running' kalan is yarim kalmis sayilir
 
 db = SQLAlchemy(app)
 
+# Raporlar icin salt okunur ayri baglanti
+report_db = reporting.ReportDatabase()
+report_db.init_app(app, db)
+
+# Calisirken yedekleme (SQLite online backup API)
+backup_manager = backups.BackupManager()
+backup_manager.init_app(app, db)
+
+
+@app.before_request
+def start_background_jobs():
+    # Ilk istekte baslar; reloader'in izleyici sureci yedek / bakim isi calistirmaz
+    start_warm_up()
+    backup_manager.start()
+    if app.config['SCHEDULER_ENABLED']:
+        maintenance.start()
+
 
 
 # ============== DATABASE MODELS ==============
@@ -116,23 +181,64 @@ class Category(db.Model):
 class MenuItem(db.Model):
     __tablename__ = 'menu_items'
     id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(40), nullable=True, unique=True, index=True)  # Toplu aktarim icin sabit kod
     name = db.Column(db.String(100), nullable=False)
     price = db.Column(db.Float, nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'))
     station_id = db.Column(db.Integer, db.ForeignKey('stations.id'), nullable=True)
     available = db.Column(db.Boolean, default=True)
+    stock = db.Column(db.Integer, nullable=True)  # None: stok takibi yok
+    sold_out = db.Column(db.Boolean, nullable=False, default=False, server_default='0')  # Stok bitince otomatik kapatildi
     station = db.relationship('Station', backref='menu_items')
+    recipe = db.relationship('RecipeItem', backref='menu_item', lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
             'id': self.id,
+            'code': self.code,
             'name': self.name,
             'price': self.price,
             'category_id': self.category_id,
             'station_id': self.station_id,
             'station_name': self.station.name if self.station else None,
             'category': self.category.key if self.category else None,
-            'available': self.available
+            'available': self.available,
+            'stock': self.stock
+        }
+
+
+class Ingredient(db.Model):
+    __tablename__ = 'ingredients'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    unit = db.Column(db.String(20), default='adet')  # adet, gr, ml
+    stock = db.Column(db.Float, default=0)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'unit': self.unit,
+            'stock': self.stock
+        }
+
+
+class RecipeItem(db.Model):
+    __tablename__ = 'recipe_items'
+    __table_args__ = (db.UniqueConstraint('menu_item_id', 'ingredient_id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), nullable=False)
+    ingredient_id = db.Column(db.Integer, db.ForeignKey('ingredients.id'), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)  # Bir porsiyon icin gereken miktar
+    ingredient = db.relationship('Ingredient')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'ingredient_id': self.ingredient_id,
+            'ingredient_name': self.ingredient.name if self.ingredient else None,
+            'unit': self.ingredient.unit if self.ingredient else None,
+            'quantity': self.quantity
         }
 
 
@@ -151,6 +257,7 @@ class Order(db.Model):
     total = db.Column(db.Float, default=0)
     payment_method = db.Column(db.String(20), nullable=True)  # cash, card
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # Iyimser kilitleme
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
     table = db.relationship('Table', backref='orders')
     
@@ -169,6 +276,7 @@ class Order(db.Model):
             'discount_type': self.discount_type,
             'total': self.total,
             'payment_method': self.payment_method,
+            'version': self.version,
             'items': [item.to_dict() for item in self.items]
         }
 
@@ -182,7 +290,14 @@ class OrderItem(db.Model):
     price = db.Column(db.Float, nullable=False)
     quantity = db.Column(db.Integer, default=1)
     note = db.Column(db.String(200), nullable=True)
-    is_printed = db.Column(db.Boolean, default=False)
+    is_printed = db.Column(db.Boolean, default=False)  # Fis gonderildi
+    # Fis gecikmesi icin zaman damgalari; reyon / yazici gonderim anindaki haliyle saklanir
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
+    print_sent_at = db.Column(db.DateTime, nullable=True)
+    printed_at = db.Column(db.DateTime, nullable=True)  # Yazici basariyla basti
+    served_at = db.Column(db.DateTime, nullable=True)
+    station_id = db.Column(db.Integer, nullable=True)
+    printer_id = db.Column(db.Integer, nullable=True)
     
     def to_dict(self):
         return {
@@ -192,7 +307,75 @@ class OrderItem(db.Model):
             'price': self.price,
             'quantity': self.quantity,
             'note': self.note,
-            'is_printed': self.is_printed
+            'is_printed': self.is_printed,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'print_sent_at': self.print_sent_at.isoformat() if self.print_sent_at else None,
+            'printed_at': self.printed_at.isoformat() if self.printed_at else None,
+            'served_at': self.served_at.isoformat() if self.served_at else None
+        }
+
+
+# Kalem sayisi; ertelenmis, sadece acikca istendiginde (?fields=order.item_count) sorguya girer
+Order.item_count = db.column_property(
+    db.select(db.func.count(OrderItem.id))
+    .where(OrderItem.order_id == Order.id)
+    .correlate_except(OrderItem)
+    .scalar_subquery(),
+    deferred=True
+)
+
+
+class OrderEvent(db.Model):
+    __tablename__ = 'order_events'
+    id = db.Column(db.Integer, primary_key=True)  # Olay sirasi
+    event_type = db.Column(db.String(30), nullable=False)
+    order_id = db.Column(db.Integer, nullable=False, index=True)
+    table_id = db.Column(db.Integer, nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.Text, nullable=True)  # JSON
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_type': self.event_type,
+            'order_id': self.order_id,
+            'table_id': self.table_id,
+            'user_id': self.user_id,
+            'payload': json.loads(self.payload) if self.payload else {},
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class Reservation(db.Model):
+    __tablename__ = 'reservations'
+    __table_args__ = (db.Index('ix_reservations_table_starts', 'table_id', 'starts_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    table_id = db.Column(db.Integer, db.ForeignKey('tables.id'), nullable=False)
+    customer_name = db.Column(db.String(100), nullable=False)
+    phone = db.Column(db.String(30), nullable=True)
+    party_size = db.Column(db.Integer, nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=False, index=True)
+    ends_at = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='booked')  # booked, seated, completed, cancelled, no_show
+    note = db.Column(db.String(200), nullable=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    table = db.relationship('Table', backref='reservations')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'table_id': self.table_id,
+            'table_name': self.table.name if self.table else None,
+            'customer_name': self.customer_name,
+            'phone': self.phone,
+            'party_size': self.party_size,
+            'starts_at': self.starts_at.isoformat() if self.starts_at else None,
+            'ends_at': self.ends_at.isoformat() if self.ends_at else None,
+            'status': self.status,
+            'note': self.note,
+            'order_id': self.order_id
         }
 
 
@@ -202,11 +385,145 @@ class Setting(db.Model):
     value = db.Column(db.String(200))
 
 
+class DailyClose(db.Model):
+    """Gun sonu (Z) kapanisi: gunun toplamlari dondurulmus haliyle"""
+    __tablename__ = 'daily_closes'
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, unique=True, nullable=False)
+    order_count = db.Column(db.Integer, default=0)
+    cancelled_count = db.Column(db.Integer, default=0)
+    item_count = db.Column(db.Integer, default=0)
+    subtotal = db.Column(db.Float, default=0)
+    tax_amount = db.Column(db.Float, default=0)
+    discount_amount = db.Column(db.Float, default=0)
+    revenue = db.Column(db.Float, default=0)
+    cash_total = db.Column(db.Float, default=0)
+    card_total = db.Column(db.Float, default=0)
+    closed_at = db.Column(db.DateTime, default=datetime.now)
+    
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'order_count': self.order_count,
+            'cancelled_count': self.cancelled_count,
+            'item_count': self.item_count,
+            'subtotal': self.subtotal,
+            'tax_amount': self.tax_amount,
+            'discount_amount': self.discount_amount,
+            'revenue': self.revenue,
+            'cash_total': self.cash_total,
+            'card_total': self.card_total,
+            'closed_at': self.closed_at.isoformat() if self.closed_at else None
+        }
+
+
+class JobRun(db.Model):
+    """Bakim isi gecmisi; (is, zaman) benzersiz oldugu icin her calismayi tek worker sahiplenir.
+
+    Ayni isin 'running' durumunda iki kaydi olmaz (run_job sahiplenirken kontrol eder).
+    """
+    __tablename__ = 'job_runs'
+    __table_args__ = (db.UniqueConstraint('job', 'scheduled_for'),)
+    id = db.Column(db.Integer, primary_key=True)
+    job = db.Column(db.String(50), nullable=False)
+    scheduled_for = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.now)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Float, nullable=True)
+    status = db.Column(db.String(20), default='running')  # running, success, failed
+    result = db.Column(db.Text, nullable=True)  # JSON
+    error = db.Column(db.Text, nullable=True)
+    worker = db.Column(db.String(100), nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job': self.job,
+            'scheduled_for': self.scheduled_for.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': self.duration_ms,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'worker': self.worker
+        }
+
+
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+    __table_args__ = {'sqlite_autoincrement': True}  # Silinen sira numaralari tekrar kullanilmaz
+    seq = db.Column(db.Integer, primary_key=True)  # Degisiklik sirasi
+    entity = db.Column(db.String(20), nullable=False)  # tables, orders, order_items, menu_items, settings
+    entity_id = db.Column(db.String(50), nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False, default=False)
+
+
 # ============== DATABASE INITIALIZATION ==============
 
-def init_database():
-    """Veritabani ve varsayilan verileri olustur"""
+def upgrade_schema():
+    """Mevcut tablolara modelde olup veritabaninda olmayan kolonlari ekle"""
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(db.engine.dialect)}'
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                conn.execute(db.text(ddl))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+SEED_VERSION = 1  # Varsayilan veriler ya da veri duzeltmeleri degisince artir
+
+
+def schema_fingerprint():
+    """Model semasi ve SEED_VERSION ozeti (PRAGMA user_version'da saklanir)"""
+    parts = [f'seed {SEED_VERSION}']
+    for table in sorted(db.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(f'table {table.name}')
+        for column in table.columns:
+            default = column.server_default.arg if column.server_default is not None else ''
+            parts.append(f'{column.name} {column.type!r} {column.nullable} {column.primary_key} {default}')
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            parts.append(f'index {index.name} {[c.name for c in index.columns]} {index.unique}')
+        for constraint in table.constraints:
+            if isinstance(constraint, db.UniqueConstraint):
+                parts.append(f'unique {sorted(c.name for c in constraint.columns)}')
+    digest = hashlib.sha256('\n'.join(sorted(parts)).encode()).digest()
+    # user_version isaretli 32 bit; 0 "hic kurulmadi" demek
+    return int.from_bytes(digest[:4], 'big') & 0x7fffffff or 1
+
+
+def init_database(force=False):
+    """Veritabanini hazirla ve bellek ici indeksleri kur.
+
+    Kayitli sema parmak izi modelle ayniysa tablo / kolon kontrolu ve
+    varsayilan veri sorgulari atlanir (hizli yeniden baslatma).
+    """
+    fingerprint = schema_fingerprint()
+    with db.engine.connect() as conn:
+        stored = conn.exec_driver_sql('PRAGMA user_version').scalar()
+    if force or stored != fingerprint:
+        setup_database()
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql(f'PRAGMA user_version = {fingerprint}')
+            conn.commit()
+        print("Veritabani baslatildi")
+    
+    rebuild_menu_index()
+    rebuild_reservation_index()
+    load_live_state()
+
+
+def setup_database():
+    """Tablolari, eksik kolonlari ve varsayilan verileri olustur"""
     db.create_all()
+    upgrade_schema()
     
     # Kullanicilar
     if User.query.count() == 0:
@@ -276,8 +593,630 @@ def init_database():
         ]
         db.session.add_all(settings)
     
+    # Kodsuz urunlere sabit kod ver
+    MenuItem.query.filter(MenuItem.code.is_(None)).update(
+        {MenuItem.code: 'M' + db.cast(MenuItem.id, db.String)}, synchronize_session=False
+    )
+    
     db.session.commit()
-    print("Veritabani baslatildi")
+
+
+# ============== INVENTORY ==============
+
+class StockError(Exception):
+    """Stok yetersiz"""
+
+
+def get_setting(key, default=None):
+    """Tek bir ayar degerini getir"""
+    setting = Setting.query.get(key)
+    return setting.value if setting else default
+
+
+def stock_consumed_on():
+    """Stok dusumu zamani: 'order' (urun eklenince) veya 'payment' (odemede)"""
+    return get_setting('stock_consume_on', 'order')
+
+
+def consume_stock(menu_item_id, quantity, strict=True):
+    """Urun stogunu ve recete malzemelerini atomik UPDATE ile dus.
+
+    Negatif miktar stogu iade eder. strict modunda stok yetmezse StockError
+    firlatilir; cagiran taraf oturumu geri almalidir.
+    """
+    if not quantity:
+        return
+
+    check = strict and quantity > 0
+
+    # Urun stogu: stock = stock - ? (sadece stok takibi olan urunlerde)
+    tracked = MenuItem.query.filter(MenuItem.id == menu_item_id, MenuItem.stock.isnot(None))
+    query = tracked.filter(MenuItem.stock >= quantity) if check else tracked
+    updated = query.update({MenuItem.stock: MenuItem.stock - quantity}, synchronize_session=False)
+    if check and not updated and tracked.count():
+        raise StockError(menu_item_id)
+    if updated:
+        record_change('menu_items', menu_item_id)
+
+    # Recete malzemeleri: tek UPDATE ile tum malzemeler
+    recipe_count = RecipeItem.query.filter_by(menu_item_id=menu_item_id).count()
+    if recipe_count:
+        needed = db.select(RecipeItem.quantity).where(
+            RecipeItem.menu_item_id == menu_item_id,
+            RecipeItem.ingredient_id == Ingredient.id
+        ).scalar_subquery() * quantity
+        query = Ingredient.query.filter(Ingredient.id.in_(
+            db.select(RecipeItem.ingredient_id).where(RecipeItem.menu_item_id == menu_item_id)
+        ))
+        if check:
+            query = query.filter(Ingredient.stock >= needed)
+        updated = query.update({Ingredient.stock: Ingredient.stock - needed}, synchronize_session=False)
+        if check and updated < recipe_count:
+            raise StockError(menu_item_id)
+
+    if quantity > 0:
+        mark_sold_out_items()
+    else:
+        mark_restocked_items()
+
+
+def short_recipe_items():
+    """Malzemesi bir porsiyona yetmeyen urunler (alt sorgu)"""
+    return db.select(RecipeItem.menu_item_id).join(Ingredient).where(
+        Ingredient.stock < RecipeItem.quantity
+    )
+
+
+def mark_sold_out_items():
+    """Stogu veya malzemesi biten urunleri satisa kapat"""
+    sold_out = [row.id for row in db.session.query(MenuItem.id).filter(
+        MenuItem.available == True,
+        db.or_(MenuItem.stock <= 0, MenuItem.id.in_(short_recipe_items()))
+    )]
+    if sold_out:
+        MenuItem.query.filter(MenuItem.id.in_(sold_out)).update(
+            {MenuItem.available: False, MenuItem.sold_out: True}, synchronize_session=False
+        )
+        for menu_item_id in sold_out:
+            record_change('menu_items', menu_item_id)
+
+
+def mark_restocked_items():
+    """Stok bittigi icin kapatilan urunleri stok ve malzemeler yetince tekrar ac.
+
+    Elle kapatilan urunlere (sold_out False) dokunulmaz.
+    """
+    restocked = [row.id for row in db.session.query(MenuItem.id).filter(
+        MenuItem.sold_out == True,
+        db.or_(MenuItem.stock.is_(None), MenuItem.stock > 0),
+        MenuItem.id.notin_(short_recipe_items())
+    )]
+    if restocked:
+        MenuItem.query.filter(MenuItem.id.in_(restocked)).update(
+            {MenuItem.available: True, MenuItem.sold_out: False}, synchronize_session=False
+        )
+        for menu_item_id in restocked:
+            record_change('menu_items', menu_item_id)
+
+
+def stock_error_response(menu_item_id):
+    db.session.rollback()
+    menu_item = MenuItem.query.get(menu_item_id)
+    name = menu_item.name if menu_item else menu_item_id
+    return jsonify({'success': False, 'error': f'Stok yetersiz: {name}'}), 409
+
+
+# ============== MENU SEARCH INDEX ==============
+
+menu_index = search.MenuSearchIndex()
+
+
+def menu_index_entry(item):
+    """Indekse eklenecek urun verisi ve kategori adi"""
+    return item.to_dict(), item.category.name if item.category else None
+
+
+def menu_item_state(item_ids):
+    """Indekste tutulmayan anlik alanlar: {id: {'available', 'stock'}}"""
+    rows = db.session.query(MenuItem.id, MenuItem.available, MenuItem.stock).filter(
+        MenuItem.id.in_(item_ids)
+    )
+    return {row.id: {'available': row.available, 'stock': row.stock} for row in rows}
+
+
+def rebuild_menu_index():
+    """Arama indeksini veritabanindan bastan kur"""
+    items = MenuItem.query.options(
+        db.joinedload(MenuItem.category),
+        db.joinedload(MenuItem.station)
+    ).all()
+    menu_index.build([menu_index_entry(item) for item in items])
+
+
+def queue_menu_index(op, *args):
+    """Indeks guncellemesini commit sonrasina ertele (rollback olursa uygulanmaz)"""
+    db.session.info.setdefault('menu_index_ops', []).append((op, args))
+
+
+@event.listens_for(db.session, 'after_commit')
+def apply_menu_index_ops(session):
+    for op, args in session.info.pop('menu_index_ops', []):
+        getattr(menu_index, op)(*args)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_menu_index_ops(session):
+    session.info.pop('menu_index_ops', None)
+
+
+# ============== ORDER EVENT JOURNAL ==============
+
+journal_writer = journal.JournalWriter(OrderEvent.__table__)
+
+
+def record_order_event(event_type, order, **payload):
+    """Siparis olayini kaydet; commit sonrasi toplu yaziciya verilir"""
+    db.session.info.setdefault('order_events', []).append({
+        'event_type': event_type,
+        'order_id': order.id,
+        'table_id': order.table_id,
+        'user_id': session.get('user_id') if has_request_context() else None,
+        'payload': payload,
+        'created_at': datetime.now()
+    })
+
+
+@event.listens_for(db.session, 'after_commit')
+def publish_order_events(db_session):
+    events = db_session.info.pop('order_events', None)
+    if events:
+        journal_writer.start(db_session.get_bind())
+        journal_writer.extend(events)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_order_events(db_session):
+    db_session.info.pop('order_events', None)
+
+
+def item_event_payload(item):
+    return {
+        'item_id': item.id,
+        'menu_item_id': item.menu_item_id,
+        'name': item.name,
+        'price': item.price,
+        'note': item.note or ''
+    }
+
+
+# ============== ORDER VERSIONING ==============
+
+def expected_order_version():
+    """Istemcinin gonderdigi beklenen siparis surumu (govdede ya da ?version=).
+
+    Siparis degisiklikleri surum gondermek zorundadir; eksik ya da tam sayi
+    olmayan surum istegi 400 ile sonlandirir.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    version = data.get('version', request.args.get('version'))
+    if version is None:
+        abort(make_response(jsonify({'success': False, 'error': 'Siparis surumu (version) gerekli'}), 400))
+    try:
+        return int(version)
+    except (TypeError, ValueError):
+        abort(make_response(jsonify({'success': False, 'error': 'Siparis surumu tam sayi olmali'}), 400))
+
+
+def check_order_version(order):
+    """Istemcinin bekledigi surum guncel mi?"""
+    return expected_order_version() == order.version
+
+
+def claim_order_version(order):
+    """Siparis surumunu atomik olarak artir (compare-and-swap).
+
+    Okundugu andan beri baska bir istek siparisi degistirdiyse False doner.
+    """
+    updated = Order.query.filter_by(id=order.id, version=order.version).update(
+        {Order.version: Order.version + 1}, synchronize_session=False
+    )
+    db.session.expire(order, ['version'])
+    record_change('orders', order.id)
+    return updated == 1
+
+
+def order_conflict_response(order_id):
+    """Surum cakismasinda guncel siparis durumuyla 409 dondur"""
+    db.session.rollback()
+    order = Order.query.get(order_id)
+    return jsonify({
+        'success': False,
+        'conflict': True,
+        'error': 'Siparis baska bir cihazda degistirildi',
+        'data': order.to_dict() if order else None
+    }), 409
+
+
+# ============== RESERVATIONS ==============
+
+reservation_index = reservations.IntervalIndex()
+
+
+def rebuild_reservation_index():
+    """Aralik indeksini aktif ve bitmemis rezervasyonlardan kur"""
+    rows = db.session.query(
+        Reservation.id, Reservation.table_id, Reservation.starts_at, Reservation.ends_at
+    ).filter(
+        Reservation.status.in_(reservations.ACTIVE_STATUSES),
+        Reservation.ends_at > datetime.now()
+    )
+    reservation_index.build(rows)
+
+
+def queue_reservation_index(reservation, remove=False):
+    """Indeks guncellemesini commit sonrasina ertele (rollback olursa uygulanmaz)"""
+    if not remove and reservation.status in reservations.ACTIVE_STATUSES:
+        op = ('upsert', (reservation.id, reservation.table_id, reservation.starts_at, reservation.ends_at))
+    else:
+        op = ('remove', (reservation.id,))
+    db.session.info.setdefault('reservation_index_ops', []).append(op)
+
+
+@event.listens_for(db.session, 'after_commit')
+def apply_reservation_index_ops(db_session):
+    for op, args in db_session.info.pop('reservation_index_ops', []):
+        getattr(reservation_index, op)(*args)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_reservation_index_ops(db_session):
+    db_session.info.pop('reservation_index_ops', None)
+
+
+def reservation_conflicts(reservation):
+    """Ayni masada cakisan aktif rezervasyonlar.
+
+    Yeni kayit flush edildikten sonra cagrilir; yazim kilidi tutuldugu icin
+    ayni anda gelen iki rezervasyon birbirini gorur. Baslangic alt siniri
+    (table_id, starts_at) indeksinde taranan araligi daraltir.
+    """
+    longest = timedelta(minutes=app.config['RESERVATION_MAX_MINUTES'])
+    return Reservation.query.filter(
+        Reservation.table_id == reservation.table_id,
+        Reservation.id != reservation.id,
+        Reservation.status.in_(reservations.ACTIVE_STATUSES),
+        Reservation.starts_at > reservation.starts_at - longest,
+        Reservation.starts_at < reservation.ends_at,
+        Reservation.ends_at > reservation.starts_at
+    ).all()
+
+
+def reservation_window(data):
+    """starts_at / ends_at (ya da duration_minutes) alanlarindan zaman araligi"""
+    starts_at = datetime.fromisoformat(data['starts_at'])
+    if data.get('ends_at'):
+        ends_at = datetime.fromisoformat(data['ends_at'])
+    else:
+        minutes = int(data.get('duration_minutes') or app.config['RESERVATION_DEFAULT_MINUTES'])
+        ends_at = starts_at + timedelta(minutes=minutes)
+    return starts_at, ends_at
+
+
+def reservation_window_error(starts_at, ends_at):
+    if ends_at <= starts_at:
+        return 'Bitis saati baslangictan sonra olmali'
+    if ends_at - starts_at > timedelta(minutes=app.config['RESERVATION_MAX_MINUTES']):
+        return 'Rezervasyon suresi cok uzun'
+    return None
+
+
+def upcoming_reservation(table_id):
+    """Masada simdi suren ya da yakinda baslayacak, henuz oturtulmamis rezervasyon"""
+    now = datetime.now()
+    hold = timedelta(minutes=app.config['RESERVATION_HOLD_MINUTES'])
+    ids = [reservation_id for _, _, reservation_id in reservation_index.overlapping(table_id, now, now + hold)]
+    if not ids:
+        return None
+    return Reservation.query.filter(
+        Reservation.id.in_(ids), Reservation.status == 'booked'
+    ).order_by(Reservation.starts_at).first()
+
+
+def release_reservation(order):
+    """Siparis kapaninca bagli rezervasyonu tamamla, masayi indekste serbest birak"""
+    for reservation in Reservation.query.filter_by(order_id=order.id, status='seated'):
+        reservation.status = 'completed'
+        reservation.ends_at = min(reservation.ends_at, datetime.now())
+        queue_reservation_index(reservation)
+
+
+# ============== SPARSE FIELDSETS ==============
+# Alanlar ve sira to_dict() ile aynidir; parametresiz istekler eski ciktiyi uretir
+
+ORDER_ITEM_RESOURCE = fieldsets.Resource(
+    OrderItem,
+    ['id', 'menu_item_id', 'name', 'price', 'quantity', 'note', 'is_printed',
+     'created_at', 'print_sent_at', 'printed_at', 'served_at'],
+    optional=['order_id']
+)
+
+ORDER_RESOURCE = fieldsets.Resource(
+    Order,
+    ['id', 'table_id', 'table_name', 'status', 'opened_at', 'closed_at', 'subtotal', 'tax_rate',
+     'tax_amount', 'discount_amount', 'discount_type', 'total', 'payment_method', 'version'],
+    computed={
+        'table_name': fieldsets.Computed(
+            lambda o: o.table.name if o.table else None, ['table_id'], {'table': ['name']}
+        ),
+    },
+    relations={'items': (ORDER_ITEM_RESOURCE, 'items')},
+    default_include=['items'],
+    optional=['item_count']
+)
+
+TABLE_RESOURCE = fieldsets.Resource(
+    Table,
+    ['id', 'name', 'capacity', 'status', 'opened_at'],
+    relations={'order': (ORDER_RESOURCE, None)},  # Acik siparis, get_tables doldurur
+    default_include=['order', 'order.items']
+)
+
+MENU_ITEM_RESOURCE = fieldsets.Resource(
+    MenuItem,
+    ['id', 'code', 'name', 'price', 'category_id', 'station_id', 'station_name', 'category',
+     'available', 'stock'],
+    computed={
+        'station_name': fieldsets.Computed(
+            lambda m: m.station.name if m.station else None, ['station_id'], {'station': ['name']}
+        ),
+        'category': fieldsets.Computed(
+            lambda m: m.category.key if m.category else None, ['category_id'], {'category': ['key']}
+        ),
+    }
+)
+
+DAILY_REPORT_RESOURCE = fieldsets.Resource(
+    None,
+    ['date', 'total_revenue', 'total_orders', 'average_order', 'cash_total', 'card_total',
+     'total_discount', 'total_tax', 'top_items'],
+    relations={'orders': (ORDER_RESOURCE, None)},
+    default_include=['orders', 'orders.items']
+)
+
+
+def request_selection(resource):
+    """?fields= ve ?include= parametrelerinden secim (hataliysa FieldsetError)"""
+    return fieldsets.select(resource, request.args.get('fields'), request.args.get('include'))
+
+
+def fieldset_error_response(error):
+    return jsonify({'success': False, 'error': str(error)}), 400
+
+
+# ============== CHANGE FEED ==============
+# Masa, siparis, siparis kalemi, menu urunu ve ayar degisiklikleri ayni
+# transaction icinde change_log'a sira numarasiyla yazilir. SQLite tek
+# yazicili oldugu icin sira numaralari commit sirasiyla ayni artar;
+# istemciler /api/changes?since=<seq> ile sadece farki alir.
+
+SETTING_RESOURCE = fieldsets.Resource(Setting, ['key', 'value'])
+
+CHANGE_FEED = {
+    'tables': (Table, fieldsets.select(TABLE_RESOURCE, include='')),
+    'orders': (Order, fieldsets.select(ORDER_RESOURCE, include='')),
+    'order_items': (OrderItem, fieldsets.select(
+        ORDER_ITEM_RESOURCE, ','.join(ORDER_ITEM_RESOURCE.fields + ['order_id'])
+    )),
+    'menu_items': (MenuItem, fieldsets.select(MENU_ITEM_RESOURCE)),
+    'settings': (Setting, fieldsets.select(SETTING_RESOURCE)),
+}
+CHANGE_ENTITIES = {model: entity for entity, (model, _) in CHANGE_FEED.items()}
+CHANGE_LOG_PRUNE_EVERY = 1000
+changes_since_prune = 0
+
+
+def record_change(entity, entity_id, deleted=False):
+    """Degisikligi commit'te change_log'a yazilmak uzere kaydet"""
+    db.session.info.setdefault('changes', {})[(entity, str(entity_id))] = deleted
+
+
+@event.listens_for(db.session, 'after_flush')
+def collect_changes(db_session, flush_context):
+    changes = db_session.info.setdefault('changes', {})
+    dirty = [obj for obj in db_session.dirty if db_session.is_modified(obj, include_collections=False)]
+    for objects, deleted in ((db_session.new, False), (dirty, False), (db_session.deleted, True)):
+        for obj in objects:
+            entity = CHANGE_ENTITIES.get(type(obj))
+            if entity is not None:
+                entity_id = db.inspect(obj).mapper.primary_key_from_instance(obj)[0]
+                changes[(entity, str(entity_id))] = deleted
+
+
+@event.listens_for(db.session, 'before_commit')
+def write_changes(db_session):
+    global changes_since_prune
+    db_session.flush()
+    changes = db_session.info.pop('changes', None)
+    if not changes:
+        return
+    db_session.execute(ChangeLog.__table__.insert(), [
+        {'entity': entity, 'entity_id': entity_id, 'deleted': deleted}
+        for (entity, entity_id), deleted in changes.items()
+    ])
+    stage_live_changes(db_session, changes)
+    
+    # Arada bir eski kayitlari buda; daha eski since degerleri tam goruntu alir
+    changes_since_prune += len(changes)
+    if changes_since_prune >= CHANGE_LOG_PRUNE_EVERY:
+        changes_since_prune = 0
+        last = db_session.query(db.func.max(ChangeLog.seq)).scalar()
+        db_session.query(ChangeLog).filter(
+            ChangeLog.seq <= last - app.config['CHANGE_LOG_RETENTION']
+        ).delete(synchronize_session=False)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_changes(db_session):
+    db_session.info.pop('changes', None)
+
+
+def change_log_bounds(db_session=None):
+    """change_log'daki en kucuk ve en buyuk sira numarasi (bos ise 0, 0)"""
+    # Ayri alt sorgular: SQLite min/max optimizasyonu tek toplamada calisir
+    first, last = (db_session or db.session).execute(db.select(
+        db.select(db.func.min(ChangeLog.seq)).scalar_subquery(),
+        db.select(db.func.max(ChangeLog.seq)).scalar_subquery()
+    )).one()
+    return first or 0, last or 0
+
+
+def load_changed_rows(entity, ids):
+    """Degisen satirlarin guncel hali; bulunamayanlar silinmis sayilir"""
+    model, selection = CHANGE_FEED[entity]
+    key = db.inspect(model).primary_key[0]
+    if key.type.python_type is int:
+        ids = [int(i) for i in ids]
+    rows = []
+    for start in range(0, len(ids), 500):
+        rows.extend(model.query.options(*fieldsets.query_options(selection)).filter(
+            key.in_(ids[start:start + 500])
+        ))
+    return [fieldsets.serialize(row, selection) for row in rows], set(ids) - {getattr(row, key.key) for row in rows}
+
+
+def change_snapshot(seq):
+    """Istemci deposu icin tam goruntu (kapali siparisler haric)"""
+    data = {'seq': seq, 'reset': True, 'changes': {}, 'deleted': {}}
+    open_orders = db.select(Order.id).where(Order.status == 'open')
+    filters = {
+        'orders': Order.status == 'open',
+        'order_items': OrderItem.order_id.in_(open_orders),
+    }
+    for entity, (model, selection) in CHANGE_FEED.items():
+        query = model.query.options(*fieldsets.query_options(selection))
+        if entity in filters:
+            query = query.filter(filters[entity])
+        data['changes'][entity] = [fieldsets.serialize(row, selection) for row in query]
+    return data
+
+
+# ============== LIVE STATE ==============
+# Masalar, acik siparisler ve kalemleri bellekte (livestate). Yazimlar
+# SQLite'a gider; degisen satirlar ayni transaction icinde tekrar okunup
+# commit sonrasi bellege uygulanir. Baska worker'larin yazimlari change_log
+# sira numarasi ilerleyince fark edilip sadece degisen satirlar okunur.
+
+live_state = livestate.LiveState()
+LIVE_MODELS = {'tables': Table, 'orders': Order, 'order_items': OrderItem}
+
+
+def read_live_rows(db_session, keys):
+    """Masa / siparis / kalem satirlari: {varlik: {id: satir ya da None (silindi)}}"""
+    ids_by_entity = {}
+    for entity, entity_id in keys:
+        if entity in LIVE_MODELS:
+            ids_by_entity.setdefault(entity, []).append(int(entity_id))
+    
+    rows = {}
+    for entity, ids in ids_by_entity.items():
+        table = LIVE_MODELS[entity].__table__
+        found = {}
+        for start in range(0, len(ids), 500):
+            stmt = db.select(table).where(table.c.id.in_(ids[start:start + 500]))
+            found.update((row['id'], dict(row)) for row in db_session.execute(stmt).mappings())
+        rows[entity] = {i: found.get(i) for i in ids}
+    return rows
+
+
+def load_live_state():
+    """Canli durumu veritabanindan bastan yukle"""
+    _, seq = change_log_bounds()
+    fetch = lambda stmt: [dict(row) for row in db.session.execute(stmt).mappings()]
+    open_orders = db.select(Order.id).where(Order.status == 'open')
+    live_state.load(
+        seq,
+        fetch(db.select(Table.__table__)),
+        fetch(db.select(Order.__table__).where(Order.status == 'open')),
+        fetch(db.select(OrderItem.__table__).where(OrderItem.order_id.in_(open_orders)))
+    )
+
+
+def sync_live_state():
+    """Diger worker / is parcaciklarinin yazimlarini bellege al (gerekirse ilk yukleme)"""
+    if not live_state.ready:
+        load_live_state()
+        return
+    first, last = change_log_bounds()
+    applied = live_state.applied_seq
+    if last == applied:
+        return
+    if last < applied or applied < first - 1:
+        # Veritabani degismis ya da gunluk budanmis: bastan yukle
+        load_live_state()
+        return
+    keys = db.session.query(ChangeLog.entity, ChangeLog.entity_id).filter(
+        ChangeLog.seq > applied,
+        ChangeLog.seq <= last,
+        ChangeLog.entity.in_(livestate.ENTITIES)
+    ).distinct().all()
+    live_state.catch_up(read_live_rows(db.session, keys), applied, last)
+
+
+def stage_live_changes(db_session, changes):
+    """write_changes'ten cagrilir: degisen satirlari transaction icinde oku"""
+    if not live_state.ready:
+        return
+    # Yazim kilidi tutuluyor; az once eklenen sira numaralari ardisik
+    last = db_session.query(db.func.max(ChangeLog.seq)).scalar()
+    keys = [key for key in changes if key[0] in LIVE_MODELS]
+    db_session.info['live_changes'] = (last - len(changes) + 1, last, read_live_rows(db_session, keys))
+
+
+@event.listens_for(db.session, 'after_commit')
+def apply_live_changes(db_session):
+    staged = db_session.info.pop('live_changes', None)
+    if staged:
+        first, last, rows = staged
+        live_state.apply(rows, first, last)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_live_changes(db_session):
+    db_session.info.pop('live_changes', None)
+
+
+def live_order_dict(order):
+    """Commit sonrasi siparis ciktisi: acik siparisler bellekten, digerleri veritabanindan"""
+    if app.config['LIVE_STATE']:
+        sync_live_state()
+        data = live_state.order_dict(order.id)
+        if data is not None:
+            return data
+    return order.to_dict()
+
+
+def live_state_diff():
+    """Bellek ile veritabani arasindaki farkli masalar (bos liste: tutarli).
+
+    Kontrol sirasinda gelen yazimlar gecici fark gosterebilir.
+    """
+    sync_live_state()
+    live = {}
+    for table in live_state.tables_list():
+        if table['order'] is not None:
+            table['order'].pop('item_count')
+        live[table['id']] = table
+    
+    diff = []
+    for table in Table.query.all():
+        data = table.to_dict()
+        open_order = Order.query.filter_by(table_id=table.id, status='open').first()
+        data['order'] = open_order.to_dict() if open_order else None
+        if live.pop(table.id, None) != data:
+            diff.append(table.id)
+    return sorted(diff + list(live))
 
 
 # ============== AUTH DECORATOR ==============
@@ -303,6 +1242,52 @@ def admin_required(f):
     return decorated_function
 
 
+def manager_required(f):
+    """Rapor yetkisi (garsonlar haric)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({'success': False, 'error': 'Giris yapmaniz gerekiyor'}), 401
+        user = User.query.get(session['user_id'])
+        if not user or user.role == 'waiter':
+            return jsonify({'success': False, 'error': 'Yetkiniz yok'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+# ============== REQUEST COALESCING ==============
+
+request_coalescer = coalesce.SingleFlight()
+
+
+def coalesced(f):
+    """Ayni anda gelen ayni GET isteklerini tek hesaplamada birlestir.
+
+    Anahtar: uc, sorgu parametreleri ve kullanici rolu. Yetki kontrolu bu
+    dekoratorden once (ustte) yapilmalidir.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        def compute():
+            response = app.make_response(f(*args, **kwargs))
+            return response.get_data(), response.status_code, list(response.headers)
+        
+        key = (tuple(sorted(request.args.items(multi=True))), tuple(sorted(kwargs.items())),
+               session.get('user_role'))
+        body, status, headers = request_coalescer.do(
+            request.endpoint, key, compute,
+            ttl=app.config['COALESCE_TTL'],
+            cacheable=lambda result: result[1] == 200
+        )
+        return app.response_class(body, status=status, headers=headers)
+    return decorated_function
+
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_coalesced(db_session):
+    request_coalescer.invalidate()
+
+
 # ============== ROUTES ==============
 
 @app.route('/')
@@ -421,18 +1406,37 @@ def delete_user(user_id):
 # ============== TABLES API ==============
 
 @app.route('/api/tables', methods=['GET'])
+@coalesced
 def get_tables():
-    """Tum masalari getir"""
-    tables = Table.query.all()
+    """Tum masalari getir (?fields= / ?include= ile daraltilabilir)"""
+    try:
+        selection = request_selection(TABLE_RESOURCE)
+    except fieldsets.FieldsetError as e:
+        return fieldset_error_response(e)
+    
+    if app.config['LIVE_STATE']:
+        sync_live_state()
+        result = [fieldsets.project(t, selection) for t in live_state.tables_list()]
+        return jsonify({'success': True, 'data': result})
+    
+    tables = Table.query.options(*fieldsets.query_options(selection)).all()
+    
+    # Acik siparisler tek sorguda; istenmediyse hic sorgulanmaz
+    order_selection = selection.relations.get('order')
+    open_orders = {}
+    if order_selection is not None:
+        rows = db.session.query(Order, Order.table_id).options(
+            *fieldsets.query_options(order_selection)
+        ).filter(Order.status == 'open').order_by(Order.id).all()
+        for order, table_id in rows:
+            open_orders.setdefault(table_id, order)
+    
     result = []
     for table in tables:
-        table_data = table.to_dict()
-        # Acik siparis varsa ekle
-        open_order = Order.query.filter_by(table_id=table.id, status='open').first()
-        if open_order:
-            table_data['order'] = open_order.to_dict()
-        else:
-            table_data['order'] = None
+        table_data = fieldsets.serialize(table, selection)
+        if order_selection is not None:
+            open_order = open_orders.get(table.id)
+            table_data['order'] = fieldsets.serialize(open_order, order_selection) if open_order else None
         result.append(table_data)
     return jsonify({'success': True, 'data': result})
 
@@ -458,6 +1462,12 @@ def create_table():
 @app.route('/api/tables/<int:table_id>', methods=['GET'])
 def get_table(table_id):
     """Tek masa getir"""
+    if app.config['LIVE_STATE']:
+        sync_live_state()
+        table_data = live_state.table_dict(table_id)
+        if table_data is not None:
+            return jsonify({'success': True, 'data': table_data})
+    
     table = Table.query.get_or_404(table_id)
     table_data = table.to_dict()
     open_order = Order.query.filter_by(table_id=table.id, status='open').first()
@@ -470,7 +1480,13 @@ def get_table(table_id):
 
 @app.route('/api/tables/<int:table_id>/open', methods=['POST'])
 def open_table(table_id):
-    """Masa ac"""
+    """Masa ac (reservation_id verilirse rezervasyon masaya oturtulur)"""
+    if app.config['LIVE_STATE']:
+        sync_live_state()
+        order_id = live_state.open_order_id(table_id)
+        if order_id is not None:
+            return jsonify({'success': True, 'data': live_state.order_dict(order_id)})
+    
     table = Table.query.get_or_404(table_id)
     
     # Zaten acik siparis var mi?
@@ -478,6 +1494,13 @@ def open_table(table_id):
     if existing_order:
         return jsonify({'success': True, 'data': existing_order.to_dict()})
     
+    data = request.get_json(silent=True) or {}
+    reservation = None
+    if data.get('reservation_id'):
+        reservation = Reservation.query.get(data['reservation_id'])
+        if not reservation or reservation.status != 'booked' or reservation.table_id != table_id:
+            return jsonify({'success': False, 'error': 'Rezervasyon bu masa icin gecerli degil'}), 400
+    
     # Yeni siparis olustur
     order = Order(
         table_id=table_id,
@@ -488,9 +1511,23 @@ def open_table(table_id):
     table.opened_at = datetime.now()
     
     db.session.add(order)
+    db.session.flush()
+    if reservation:
+        reservation.status = 'seated'
+        reservation.order_id = order.id
+        queue_reservation_index(reservation)
+    record_order_event('opened', order, tax_rate=order.tax_rate)
     db.session.commit()
     
-    return jsonify({'success': True, 'data': order.to_dict()})
+    response = {'success': True, 'data': live_order_dict(order)}
+    if reservation:
+        response['reservation'] = reservation.to_dict()
+    else:
+        # Masa yakinda baskasina rezerve ise uyar
+        upcoming = upcoming_reservation(table_id)
+        if upcoming:
+            response['reservation_warning'] = upcoming.to_dict()
+    return jsonify(response)
 
 
 @app.route('/api/tables/<int:table_id>/close', methods=['POST'])
@@ -500,8 +1537,18 @@ def close_table(table_id):
     open_order = Order.query.filter_by(table_id=table_id, status='open').first()
     
     if open_order:
+        if not check_order_version(open_order):
+            return order_conflict_response(open_order.id)
         open_order.status = 'cancelled'
         open_order.closed_at = datetime.now()
+        # Iptal edilen siparisin stogunu iade et
+        if stock_consumed_on() == 'order':
+            for item in open_order.items:
+                consume_stock(item.menu_item_id, -item.quantity)
+        if not claim_order_version(open_order):
+            return order_conflict_response(open_order.id)
+        release_reservation(open_order)
+        record_order_event('cancelled', open_order)
     
     table.status = 'available'
     table.opened_at = None
@@ -510,23 +1557,202 @@ def close_table(table_id):
     return jsonify({'success': True, 'message': 'Masa kapatildi'})
 
 
+# ============== RESERVATIONS API ==============
+
+@app.route('/api/reservations', methods=['GET'])
+@login_required
+def get_reservations():
+    """Bir gunun (?date=) rezervasyonlari; ?table_id= ve ?status= ile suzulebilir"""
+    try:
+        day = datetime.strptime(request.args['date'], '%Y-%m-%d') if 'date' in request.args \
+            else datetime.combine(datetime.now().date(), datetime.min.time())
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Tarih formati YYYY-AA-GG olmali'}), 400
+    
+    query = Reservation.query.options(db.joinedload(Reservation.table)).filter(
+        Reservation.starts_at >= day, Reservation.starts_at < day + timedelta(days=1)
+    )
+    if request.args.get('table_id', type=int):
+        query = query.filter(Reservation.table_id == request.args.get('table_id', type=int))
+    if request.args.get('status'):
+        query = query.filter(Reservation.status == request.args['status'])
+    return jsonify({'success': True, 'data': [r.to_dict() for r in query.order_by(Reservation.starts_at)]})
+
+
+@app.route('/api/reservations/availability', methods=['GET'])
+@login_required
+def get_reservation_availability():
+    """Verilen aralikta (?start=&end= ya da ?date=&from=&to=) party_size kisiyi oturtabilecek bos masalar"""
+    args = request.args
+    try:
+        if 'start' in args:
+            starts_at, ends_at = reservation_window({'starts_at': args['start'], 'ends_at': args.get('end')})
+        else:
+            day = args.get('date') or datetime.now().date().isoformat()
+            starts_at, ends_at = reservation_window({
+                'starts_at': f"{day}T{args['from']}",
+                'ends_at': f"{day}T{args['to']}" if args.get('to') else None
+            })
+    except (KeyError, ValueError):
+        return jsonify({'success': False, 'error': 'Gecersiz tarih / saat'}), 400
+    error = reservation_window_error(starts_at, ends_at)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    party_size = args.get('party_size', 1, type=int)
+    
+    busy = reservation_index.busy_tables(starts_at, ends_at)
+    # Simdi dolu olan masalar yakin zamanli aralik icin bos sayilmaz
+    occupied_matters = starts_at < datetime.now() + timedelta(minutes=app.config['RESERVATION_HOLD_MINUTES'])
+    tables = Table.query.filter(Table.capacity >= party_size).order_by(Table.capacity, Table.id)
+    available = [
+        table.to_dict() for table in tables
+        if table.id not in busy and not (occupied_matters and table.status == 'occupied')
+    ]
+    return jsonify({
+        'success': True,
+        'data': {
+            'starts_at': starts_at.isoformat(),
+            'ends_at': ends_at.isoformat(),
+            'party_size': party_size,
+            'tables': available
+        }
+    })
+
+
+def save_reservation(reservation):
+    """Kapasite ve cakisma kontrolu yapip kaydet; hata varsa (yanit, kod) dondur"""
+    error = reservation_window_error(reservation.starts_at, reservation.ends_at)
+    if error:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': error}), 400
+    
+    table = Table.query.get(reservation.table_id)
+    if not table:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Masa bulunamadi'}), 400
+    if not reservation.party_size or reservation.party_size < 1 or reservation.party_size > (table.capacity or 0):
+        db.session.rollback()
+        return jsonify({'success': False, 'error': f'{table.name} en fazla {table.capacity} kisilik'}), 400
+    
+    db.session.flush()
+    if reservation.status in reservations.ACTIVE_STATUSES:
+        conflicts = [r.to_dict() for r in reservation_conflicts(reservation)]
+        if conflicts:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': 'Masa bu saatte rezerve', 'conflicts': conflicts}), 409
+    
+    queue_reservation_index(reservation)
+    db.session.commit()
+    return None
+
+
+@app.route('/api/reservations', methods=['POST'])
+@login_required
+def create_reservation():
+    """Yeni rezervasyon"""
+    data = request.json or {}
+    if not data.get('customer_name') or not data.get('table_id'):
+        return jsonify({'success': False, 'error': 'Masa ve musteri adi gerekli'}), 400
+    try:
+        starts_at, ends_at = reservation_window(data)
+        party_size = int(data.get('party_size') or 0)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'Gecersiz tarih / saat'}), 400
+    
+    reservation = Reservation(
+        table_id=data['table_id'],
+        customer_name=data['customer_name'],
+        phone=data.get('phone'),
+        party_size=party_size,
+        starts_at=starts_at,
+        ends_at=ends_at,
+        note=data.get('note'),
+        status='booked'
+    )
+    db.session.add(reservation)
+    error = save_reservation(reservation)
+    if error:
+        return error
+    return jsonify({'success': True, 'data': reservation.to_dict()})
+
+
+@app.route('/api/reservations/<int:reservation_id>', methods=['PUT'])
+@login_required
+def update_reservation(reservation_id):
+    """Rezervasyonu guncelle (saat, masa, kisi sayisi, durum: cancelled / no_show)"""
+    reservation = Reservation.query.get_or_404(reservation_id)
+    data = request.json or {}
+    
+    if 'starts_at' in data or 'ends_at' in data or 'duration_minutes' in data:
+        # Sadece baslangic degisirse sure korunur
+        duration = (reservation.ends_at - reservation.starts_at).total_seconds() // 60
+        try:
+            reservation.starts_at, reservation.ends_at = reservation_window({
+                'starts_at': data.get('starts_at', reservation.starts_at.isoformat()),
+                'ends_at': data.get('ends_at'),
+                'duration_minutes': data.get('duration_minutes') or duration
+            })
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Gecersiz tarih / saat'}), 400
+    
+    if 'party_size' in data:
+        try:
+            reservation.party_size = int(data['party_size'] or 0)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Gecersiz kisi sayisi'}), 400
+    for field in ('table_id', 'customer_name', 'phone', 'note'):
+        if field in data:
+            setattr(reservation, field, data[field])
+    if 'status' in data:
+        if data['status'] not in ('booked', 'cancelled', 'no_show'):
+            return jsonify({'success': False, 'error': 'Gecersiz durum'}), 400
+        reservation.status = data['status']
+    
+    error = save_reservation(reservation)
+    if error:
+        return error
+    return jsonify({'success': True, 'data': reservation.to_dict()})
+
+
+@app.route('/api/reservations/<int:reservation_id>', methods=['DELETE'])
+@login_required
+def delete_reservation(reservation_id):
+    """Rezervasyon sil"""
+    reservation = Reservation.query.get_or_404(reservation_id)
+    queue_reservation_index(reservation, remove=True)
+    db.session.delete(reservation)
+    db.session.commit()
+    return jsonify({'success': True, 'message': 'Rezervasyon silindi'})
+
+
 # ============== ORDERS API ==============
 
 @app.route('/api/orders/<int:order_id>/items', methods=['POST'])
 def add_order_item(order_id):
     """Siparise urun ekle"""
     order = Order.query.get_or_404(order_id)
+    if not check_order_version(order):
+        return order_conflict_response(order_id)
     data = request.json
     menu_item_id = data.get('menu_item_id')
     quantity = data.get('quantity', 1)
     note = data.get('note', '')
     
     menu_item = MenuItem.query.get_or_404(menu_item_id)
+    if not menu_item.available:
+        return jsonify({'success': False, 'error': f'Urun tukendi: {menu_item.name}'}), 409
     
-    # Ayni urun var mi?
-    existing = OrderItem.query.filter_by(order_id=order_id, menu_item_id=menu_item_id, note=note).first()
-    if existing:
-        existing.quantity += quantity
+    if stock_consumed_on() == 'order':
+        try:
+            consume_stock(menu_item_id, quantity)
+        except StockError:
+            return stock_error_response(menu_item_id)
+    
+    # Ayni urun var mi? Fisi gonderilmis kaleme eklenmez; yeni fis (ve gecikme olcumu) olur
+    item = OrderItem.query.filter_by(order_id=order_id, menu_item_id=menu_item_id, note=note,
+                                     is_printed=False).first()
+    if item:
+        item.quantity += quantity
     else:
         item = OrderItem(
             order_id=order_id,
@@ -540,44 +1766,78 @@ def add_order_item(order_id):
     
     # Toplami guncelle
     update_order_totals(order)
+    if not claim_order_version(order):
+        return order_conflict_response(order_id)
+    record_order_event('item_added', order, quantity=quantity, **item_event_payload(item))
     db.session.commit()
     
-    return jsonify({'success': True, 'data': order.to_dict()})
+    return jsonify({'success': True, 'data': live_order_dict(order)})
 
 
 @app.route('/api/orders/<int:order_id>/items/<int:item_id>', methods=['PUT'])
 def update_order_item(order_id, item_id):
     """Siparis kalemini guncelle"""
     order = Order.query.get_or_404(order_id)
+    if not check_order_version(order):
+        return order_conflict_response(order_id)
     item = OrderItem.query.get_or_404(item_id)
     data = request.json
     
     if 'quantity' in data:
-        if data['quantity'] <= 0:
+        new_quantity = max(data['quantity'], 0)
+        if stock_consumed_on() == 'order':
+            try:
+                consume_stock(item.menu_item_id, new_quantity - item.quantity)
+            except StockError:
+                return stock_error_response(item.menu_item_id)
+        
+        if new_quantity == 0:
             db.session.delete(item)
+            record_order_event('item_removed', order, **item_event_payload(item))
         else:
-            item.quantity = data['quantity']
+            item.quantity = new_quantity
+            record_order_event('quantity_changed', order, quantity=new_quantity, **item_event_payload(item))
     
     if 'note' in data:
         item.note = data['note']
+        record_order_event('note_changed', order, **item_event_payload(item))
     
     update_order_totals(order)
+    if not claim_order_version(order):
+        return order_conflict_response(order_id)
     db.session.commit()
     
-    return jsonify({'success': True, 'data': order.to_dict()})
+    return jsonify({'success': True, 'data': live_order_dict(order)})
 
 
 @app.route('/api/orders/<int:order_id>/items/<int:item_id>', methods=['DELETE'])
 def delete_order_item(order_id, item_id):
     """Siparis kalemini sil"""
     order = Order.query.get_or_404(order_id)
+    if not check_order_version(order):
+        return order_conflict_response(order_id)
     item = OrderItem.query.get_or_404(item_id)
     
+    if stock_consumed_on() == 'order':
+        consume_stock(item.menu_item_id, -item.quantity)
     db.session.delete(item)
+    record_order_event('item_removed', order, **item_event_payload(item))
     update_order_totals(order)
+    if not claim_order_version(order):
+        return order_conflict_response(order_id)
     db.session.commit()
     
-    return jsonify({'success': True, 'data': order.to_dict()})
+    return jsonify({'success': True, 'data': live_order_dict(order)})
+
+
+@app.route('/api/orders/<int:order_id>/items/<int:item_id>/served', methods=['POST'])
+def serve_order_item(order_id, item_id):
+    """Kalemi servis edildi olarak isaretle (ilk isaretleme zamani korunur)"""
+    item = OrderItem.query.filter_by(id=item_id, order_id=order_id).first_or_404()
+    if item.served_at is None:
+        item.served_at = datetime.now()
+        db.session.commit()
+    return jsonify({'success': True, 'data': live_order_dict(item.order)})
 
 
 def update_order_totals(order):
@@ -594,6 +1854,8 @@ def update_order_totals(order):
 def process_payment(order_id):
     """Odeme islemi"""
     order = Order.query.get_or_404(order_id)
+    if not check_order_version(order):
+        return order_conflict_response(order_id)
     data = request.json
     
     # Indirim uygula
@@ -620,12 +1882,27 @@ def process_payment(order_id):
     order.status = 'paid'
     order.closed_at = datetime.now()
     
+    # Stok odemede dusuluyorsa simdi dus (servis edilmis urun reddedilmez)
+    if stock_consumed_on() == 'payment':
+        for item in order.items:
+            consume_stock(item.menu_item_id, item.quantity, strict=False)
+    
     # Masayi bosalt
     table = Table.query.get(order.table_id)
     if table:
         table.status = 'available'
         table.opened_at = None
     
+    if not claim_order_version(order):
+        return order_conflict_response(order_id)
+    release_reservation(order)
+    if order.discount_type:
+        record_order_event('discount_applied', order,
+                           discount_type=order.discount_type,
+                           discount_amount=order.discount_amount)
+    record_order_event('paid', order,
+                       payment_method=order.payment_method,
+                       total=order.total)
     db.session.commit()
     
     return jsonify({
@@ -635,9 +1912,60 @@ def process_payment(order_id):
     })
 
 
+@app.route('/api/orders/<int:order_id>/events', methods=['GET'])
+@manager_required
+def get_order_events(order_id):
+    """Siparisin degisiklik gecmisi (kim, ne zaman, ne yapti)"""
+    journal_writer.flush()
+    events = OrderEvent.query.filter_by(order_id=order_id).order_by(OrderEvent.id).all()
+    return jsonify({'success': True, 'data': [e.to_dict() for e in events]})
+
+
+@app.cli.command('replay-journal')
+@click.option('--order', 'order_id', type=int, default=None, help='Sadece bu siparisi kur')
+@click.option('--verify', is_flag=True, help='Sonucu orders tablosuyla karsilastir')
+@click.option('--rollup', 'show_rollup', is_flag=True, help='Gunluk ozetleri yazdir')
+def replay_journal_command(order_id, verify, show_rollup):
+    """Olay gunlugunden siparis durumunu veya gunluk ozetleri yeniden kur"""
+    query = OrderEvent.query.order_by(OrderEvent.id)
+    if order_id is not None:
+        query = query.filter_by(order_id=order_id)
+    events = [e.to_dict() for e in query.yield_per(1000)]
+    
+    if show_rollup:
+        for day, summary in journal.rollup(events).items():
+            print(f"{day}: {summary['orders']} siparis, {summary['revenue']:.2f} ciro, {summary['cancelled']} iptal")
+        return
+    
+    orders = journal.replay(events)
+    if not verify:
+        for order in orders.values():
+            print(json.dumps(order, default=str, ensure_ascii=False))
+        return
+    
+    mismatches = 0
+    for replayed in orders.values():
+        stored = Order.query.get(replayed['id'])
+        expected = {
+            'status': stored.status,
+            'total': round(stored.total or 0, 2),
+            'items': sorted((i.id, i.quantity) for i in stored.items)
+        } if stored else None
+        actual = {
+            'status': replayed['status'],
+            'total': round(replayed['total'], 2),
+            'items': sorted((i['id'], i['quantity']) for i in replayed['items'].values())
+        }
+        if expected != actual:
+            mismatches += 1
+            print(f"Siparis {replayed['id']}: veritabani={expected} gunluk={actual}")
+    print(f"{len(orders)} siparis kontrol edildi, {mismatches} uyusmazlik")
+
+
 # ============== MENU API ==============
 
 @app.route('/api/menu', methods=['GET'])
+@coalesced
 def get_menu():
     """Tum menuyu getir"""
     categories = Category.query.all()
@@ -648,6 +1976,21 @@ def get_menu():
     return jsonify({'success': True, 'data': result})
 
 
+@app.route('/api/menu/search', methods=['GET'])
+def search_menu():
+    """Menude ara (onek, Turkce karakter katlama ve harf hatasi toleransi)"""
+    if not menu_index.ready:
+        rebuild_menu_index()
+    
+    results = menu_index.search(
+        request.args.get('q', ''),
+        limit=request.args.get('limit', 20, type=int),
+        available_only=request.args.get('all') != '1',
+        state=menu_item_state
+    )
+    return jsonify({'success': True, 'data': results})
+
+
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     """Kategorileri getir"""
@@ -671,10 +2014,34 @@ def create_category():
 
 
 @app.route('/api/menu/items', methods=['GET'])
+@coalesced
 def get_all_menu_items():
-    """Tum menu urunlerini getir"""
-    items = MenuItem.query.all()
-    return jsonify({'success': True, 'data': [item.to_dict() for item in items]})
+    """Tum menu urunlerini getir (?fields= ile daraltilabilir)"""
+    try:
+        selection = request_selection(MENU_ITEM_RESOURCE)
+    except fieldsets.FieldsetError as e:
+        return fieldset_error_response(e)
+    
+    items = MenuItem.query.options(*fieldsets.query_options(selection)).all()
+    return jsonify({'success': True, 'data': [fieldsets.serialize(item, selection) for item in items]})
+
+
+def menu_code_taken(code):
+    return db.session.query(MenuItem.query.filter_by(code=code).exists()).scalar()
+
+
+def unused_menu_code(item_id):
+    """Otomatik urun kodu: M<id>; ice aktarilan bir urun almissa M<id>-2, M<id>-3 ..."""
+    code, suffix = f'M{item_id}', 1
+    while menu_code_taken(code):
+        suffix += 1
+        code = f'M{item_id}-{suffix}'
+    return code
+
+
+def menu_code_conflict_response(code):
+    db.session.rollback()
+    return jsonify({'success': False, 'error': f'Bu urun kodu zaten kullaniliyor: {code}'}), 409
 
 
 @app.route('/api/menu/items', methods=['POST'])
@@ -682,13 +2049,23 @@ def get_all_menu_items():
 def create_menu_item():
     """Yeni menu urunu olustur"""
     data = request.json
+    code = str(data.get('code') or '').strip() or None
+    if code and menu_code_taken(code):
+        return menu_code_conflict_response(code)
     item = MenuItem(
         name=data.get('name'),
         price=data.get('price'),
         category_id=data.get('category_id'),
-        available=data.get('available', True)
+        station_id=data.get('station_id'),
+        available=data.get('available', True),
+        stock=data.get('stock'),
+        code=code
     )
     db.session.add(item)
+    db.session.flush()
+    if not item.code:
+        item.code = unused_menu_code(item.id)
+    queue_menu_index('upsert', *menu_index_entry(item))
     db.session.commit()
     return jsonify({'success': True, 'data': item.to_dict()})
 
@@ -706,9 +2083,26 @@ def update_menu_item(item_id):
         item.price = data['price']
     if 'category_id' in data:
         item.category_id = data['category_id']
+    if 'station_id' in data:
+        item.station_id = data['station_id']
+    code = str(data.get('code') or '').strip()
+    if code and code != item.code:
+        if menu_code_taken(code):
+            return menu_code_conflict_response(code)
+        item.code = code
+    if 'stock' in data:
+        item.stock = data['stock']
+        # Stok girilen urun satisa acilir, stogu biten kapanir
+        if item.stock is not None and 'available' not in data:
+            item.available = item.stock > 0
+            item.sold_out = not item.available
     if 'available' in data:
         item.available = data['available']
+        item.sold_out = False  # Elle verilen karar stok otomasyonunu gecersiz kilar
     
+    db.session.flush()
+    db.session.expire(item, ['category', 'station'])  # category_id degismis olabilir
+    queue_menu_index('upsert', *menu_index_entry(item))
     db.session.commit()
     return jsonify({'success': True, 'data': item.to_dict()})
 
@@ -719,21 +2113,253 @@ def delete_menu_item(item_id):
     """Menu urunu sil"""
     item = MenuItem.query.get_or_404(item_id)
     db.session.delete(item)
+    queue_menu_index('remove', item_id)
     db.session.commit()
     return jsonify({'success': True, 'message': 'Urun silindi'})
 
 
+def menu_snapshot(query_session=None):
+    """Mevcut menu (kategoriler, reyonlar, urunler) aktarim bicimiyle"""
+    query_session = query_session or db.session
+    categories = query_session.query(Category).order_by(Category.id).all()
+    stations = query_session.query(Station).options(db.joinedload(Station.printer)).order_by(Station.id).all()
+    items = query_session.query(MenuItem).options(
+        db.joinedload(MenuItem.category),
+        db.joinedload(MenuItem.station)
+    ).order_by(MenuItem.id).all()
+    return {
+        'categories': [{'key': c.key, 'name': c.name, 'icon': c.icon} for c in categories],
+        'stations': [{'name': s.name, 'printer': s.printer.name if s.printer else None} for s in stations],
+        'items': [{
+            'code': i.code,
+            'name': i.name,
+            'price': i.price,
+            'category': i.category.key if i.category else None,
+            'station': i.station.name if i.station else None,
+            'available': i.available,
+            'stock': i.stock
+        } for i in items]
+    }
+
+
+@app.route('/api/menu/export', methods=['GET'])
+@admin_required
+def export_menu():
+    """Menuyu JSON veya CSV olarak disa aktar"""
+    fmt = request.args.get('format', 'json')
+    if fmt not in ('json', 'csv'):
+        return jsonify({'success': False, 'error': 'Bicim json veya csv olmali'}), 400
+    
+    snapshot = menu_snapshot(report_db.session)
+    content = menu_io.export(snapshot['categories'], snapshot['stations'], snapshot['items'], fmt)
+    mimetype = 'application/json' if fmt == 'json' else 'text/csv'
+    return app.response_class(content, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=menu.{fmt}'
+    })
+
+
+@app.route('/api/menu/import', methods=['POST'])
+@admin_required
+def import_menu():
+    """Toplu menu yukleme (once tum dosya dogrulanir, sonra tek transaction).
+    
+    ?format=json|csv, ?dry_run=1 sadece farki dondurur.
+    """
+    upload = request.files.get('file')
+    if upload:
+        raw = upload.read()
+        default_fmt = 'csv' if upload.filename.lower().endswith('.csv') else 'json'
+    else:
+        raw = request.get_data()
+        default_fmt = 'csv' if request.mimetype == 'text/csv' else 'json'
+    fmt = request.args.get('format', default_fmt)
+    dry_run = request.args.get('dry_run') in ('1', 'true')
+    
+    try:
+        # UnicodeDecodeError da ValueError: UTF-8 olmayan dosya 400 doner
+        data = menu_io.parse(raw.decode('utf-8'), fmt)
+    except (ValueError, csv.Error) as e:
+        return jsonify({'success': False, 'error': f'Dosya okunamadi: {e}'}), 400
+    
+    snapshot = menu_snapshot()
+    clean, errors = menu_io.validate(
+        data,
+        [c['key'] for c in snapshot['categories']],
+        [s['name'] for s in snapshot['stations']]
+    )
+    if errors:
+        return jsonify({'success': False, 'error': 'Dosyada hatalar var', 'errors': errors[:100]}), 400
+    
+    changes = menu_io.diff(clean, {
+        'categories': {c['key']: c for c in snapshot['categories']},
+        'stations': {s['name']: s for s in snapshot['stations']},
+        'items': {i['code']: i for i in snapshot['items']}
+    })
+    if dry_run:
+        return jsonify({'success': True, 'dry_run': True, 'data': changes})
+    
+    apply_menu_import(clean, changes)
+    return jsonify({'success': True, 'data': changes})
+
+
+def apply_menu_import(clean, changes):
+    """Dogrulanmis menuyu tek transaction ile toplu olarak yaz"""
+    try:
+        categories = {c.key: c for c in Category.query}
+        for row in clean['categories']:
+            category = categories.get(row['key'])
+            if category is None:
+                category = categories[row['key']] = Category(key=row['key'])
+                db.session.add(category)
+            category.name = row['name']
+            category.icon = row['icon'] or category.icon or 'ph-folder'
+        
+        printers = {p.name: p.id for p in Printer.query}
+        stations = {s.name: s for s in Station.query}
+        for row in clean['stations']:
+            station = stations.get(row['name'])
+            if station is None:
+                station = stations[row['name']] = Station(name=row['name'])
+                db.session.add(station)
+            if row['printer']:
+                station.printer_id = printers.get(row['printer'], station.printer_id)
+        db.session.flush()
+        
+        existing = dict(db.session.query(MenuItem.code, MenuItem.id).filter(MenuItem.code.isnot(None)))
+        updated_codes = {u['code'] for u in changes['items']['update']}
+        inserts, updates = [], []
+        for row in clean['items']:
+            mapping = {
+                'code': row['code'],
+                'name': row['name'],
+                'price': row['price'],
+                'category_id': categories[row['category']].id if row['category'] else None,
+                'station_id': stations[row['station']].id if row['station'] else None,
+                'available': row['available'],
+                'stock': row['stock']
+            }
+            if row['code'] not in existing:
+                inserts.append(mapping)
+            elif row['code'] in updated_codes:
+                updates.append({'id': existing[row['code']], **mapping})
+        
+        db.session.bulk_insert_mappings(MenuItem, inserts)
+        db.session.bulk_update_mappings(MenuItem, updates)
+        
+        # Toplu yazim ORM olaylarini tetiklemez; degisiklik gunlugune elle ekle
+        touched = [m['code'] for m in inserts + updates]
+        for start in range(0, len(touched), 500):
+            for (menu_item_id,) in db.session.query(MenuItem.id).filter(MenuItem.code.in_(touched[start:start + 500])):
+                record_change('menu_items', menu_item_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    rebuild_menu_index()
+
+
+@app.route('/api/menu/items/<int:item_id>/recipe', methods=['GET'])
+@admin_required
+def get_recipe(item_id):
+    """Urun recetesini getir"""
+    item = MenuItem.query.get_or_404(item_id)
+    return jsonify({'success': True, 'data': [r.to_dict() for r in item.recipe]})
+
+
+@app.route('/api/menu/items/<int:item_id>/recipe', methods=['PUT'])
+@admin_required
+def update_recipe(item_id):
+    """Urun recetesini guncelle ([{ingredient_id, quantity}, ...])"""
+    item = MenuItem.query.get_or_404(item_id)
+    data = request.json or []
+    
+    item.recipe = [
+        RecipeItem(ingredient_id=r['ingredient_id'], quantity=r['quantity'])
+        for r in data if r.get('quantity', 0) > 0
+    ]
+    db.session.commit()
+    return jsonify({'success': True, 'data': [r.to_dict() for r in item.recipe]})
+
+
+# ============== INVENTORY API ==============
+
+@app.route('/api/inventory/ingredients', methods=['GET'])
+@admin_required
+def get_ingredients():
+    """Malzemeleri getir"""
+    ingredients = Ingredient.query.order_by(Ingredient.name).all()
+    return jsonify({'success': True, 'data': [i.to_dict() for i in ingredients]})
+
+
+@app.route('/api/inventory/ingredients', methods=['POST'])
+@admin_required
+def create_ingredient():
+    """Yeni malzeme olustur"""
+    data = request.json
+    if not data.get('name'):
+        return jsonify({'success': False, 'error': 'Malzeme adi gerekli'}), 400
+    
+    ingredient = Ingredient(
+        name=data.get('name'),
+        unit=data.get('unit', 'adet'),
+        stock=data.get('stock', 0)
+    )
+    db.session.add(ingredient)
+    db.session.commit()
+    return jsonify({'success': True, 'data': ingredient.to_dict()})
+
+
+@app.route('/api/inventory/ingredients/<int:ingredient_id>', methods=['PUT'])
+@admin_required
+def update_ingredient(ingredient_id):
+    """Malzeme guncelle (stok girisi icin 'add' kullanilabilir)"""
+    ingredient = Ingredient.query.get_or_404(ingredient_id)
+    data = request.json
+    
+    if 'name' in data:
+        ingredient.name = data['name']
+    if 'unit' in data:
+        ingredient.unit = data['unit']
+    if 'stock' in data:
+        ingredient.stock = data['stock']
+    if 'add' in data:
+        # Es zamanli dusumlerle cakismamasi icin atomik artir
+        Ingredient.query.filter_by(id=ingredient_id).update(
+            {Ingredient.stock: Ingredient.stock + data['add']}, synchronize_session=False
+        )
+    if 'stock' in data or 'add' in data:
+        db.session.flush()
+        mark_sold_out_items()
+        mark_restocked_items()
+    
+    db.session.commit()
+    db.session.refresh(ingredient)
+    return jsonify({'success': True, 'data': ingredient.to_dict()})
+
+
+@app.route('/api/inventory/ingredients/<int:ingredient_id>', methods=['DELETE'])
+@admin_required
+def delete_ingredient(ingredient_id):
+    """Malzeme sil"""
+    ingredient = Ingredient.query.get_or_404(ingredient_id)
+    RecipeItem.query.filter_by(ingredient_id=ingredient_id).delete()
+    db.session.delete(ingredient)
+    db.session.commit()
+    return jsonify({'success': True, 'message': 'Malzeme silindi'})
+
+
 # ============== REPORTS API ==============
 
 @app.route('/api/reports/daily', methods=['GET'])
+@manager_required
+@coalesced
 def get_daily_report():
     """Gunluk rapor"""
-    if 'user_id' not in session:
-        return jsonify({'success': False, 'error': 'Giris yapmaniz gerekiyor'}), 401
-    
-    current_user = User.query.get(session['user_id'])
-    if not current_user or current_user.role == 'waiter':
-        return jsonify({'success': False, 'error': 'Yetkiniz yok'}), 403
+    try:
+        selection = request_selection(DAILY_REPORT_RESOURCE)
+    except fieldsets.FieldsetError as e:
+        return fieldset_error_response(e)
 
     date_str = request.args.get('date')
     if date_str:
@@ -742,35 +2368,22 @@ def get_daily_report():
         report_date = datetime.now().date()
     
     # Gunu icindeki kapanan siparisler
-    from sqlalchemy import func
-    
-    orders = Order.query.filter(
-        Order.status == 'paid',
-        func.date(Order.closed_at) == report_date
-    ).all()
-    
-    total_revenue = sum(o.total for o in orders)
-    total_orders = len(orders)
-    cash_total = sum(o.total for o in orders if o.payment_method == 'cash')
-    card_total = sum(o.total for o in orders if o.payment_method == 'card')
-    total_discount = sum(o.discount_amount for o in orders)
-    total_tax = sum(o.tax_amount for o in orders)
-    
-    # En cok satilan urunler
-    item_sales = {}
-    for order in orders:
-        for item in order.items:
-            if item.name not in item_sales:
-                item_sales[item.name] = {'qty': 0, 'revenue': 0}
-            item_sales[item.name]['qty'] += item.quantity
-            item_sales[item.name]['revenue'] += item.price * item.quantity
+    paid_on_day = (Order.status == 'paid', func.date(Order.closed_at) == report_date)
+    query = report_db.session.query
+    report = {'date': report_date.isoformat()}
     
-    top_items = sorted(item_sales.items(), key=lambda x: x[1]['qty'], reverse=True)[:10]
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'date': report_date.isoformat(),
+    # Toplamlar tek toplama sorgusuyla; siparisler ve kalemleri yuklenmez
+    if set(selection.fields) - {'date', 'top_items'}:
+        (total_orders, total_revenue, cash_total, card_total,
+         total_discount, total_tax) = query(
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.total), 0),
+            func.coalesce(func.sum(case((Order.payment_method == 'cash', Order.total), else_=0)), 0),
+            func.coalesce(func.sum(case((Order.payment_method == 'card', Order.total), else_=0)), 0),
+            func.coalesce(func.sum(Order.discount_amount), 0),
+            func.coalesce(func.sum(Order.tax_amount), 0)
+        ).filter(*paid_on_day).one()
+        report.update({
             'total_revenue': total_revenue,
             'total_orders': total_orders,
             'average_order': total_revenue / total_orders if total_orders > 0 else 0,
@@ -778,25 +2391,89 @@ def get_daily_report():
             'card_total': card_total,
             'total_discount': total_discount,
             'total_tax': total_tax,
-            'top_items': [{'name': k, **v} for k, v in top_items],
-            'orders': [o.to_dict() for o in orders]
-        }
-    })
+        })
+    
+    # En cok satilan urunler
+    if 'top_items' in selection.fields:
+        qty = func.sum(OrderItem.quantity)
+        top_items = query(OrderItem.name, qty, func.sum(OrderItem.price * OrderItem.quantity)).join(
+            Order, OrderItem.order_id == Order.id
+        ).filter(*paid_on_day).group_by(OrderItem.name).order_by(qty.desc(), func.min(OrderItem.id)).limit(10).all()
+        report['top_items'] = [{'name': name, 'qty': q, 'revenue': revenue} for name, q, revenue in top_items]
+    
+    data = {field: report[field] for field in selection.fields}
+    order_selection = selection.relations.get('orders')
+    if order_selection is not None:
+        orders = query(Order).options(*fieldsets.query_options(order_selection)).filter(*paid_on_day).all()
+        data['orders'] = [fieldsets.serialize(o, order_selection) for o in orders]
+    
+    return jsonify({'success': True, 'data': data})
 
 
 @app.route('/api/reports/orders', methods=['GET'])
+@manager_required
+@coalesced
 def get_order_history():
     """Siparis gecmisi"""
-    if 'user_id' not in session:
-        return jsonify({'success': False, 'error': 'Giris yapmaniz gerekiyor'}), 401
+    try:
+        selection = request_selection(ORDER_RESOURCE)
+    except fieldsets.FieldsetError as e:
+        return fieldset_error_response(e)
+
+    orders = report_db.session.query(Order).options(
+        *fieldsets.query_options(selection)
+    ).filter_by(status='paid').order_by(Order.closed_at.desc()).limit(100).all()
+    return jsonify({'success': True, 'data': [fieldsets.serialize(o, selection) for o in orders]})
+
+
+@app.route('/api/reports/analytics', methods=['GET'])
+@manager_required
+def get_analytics_report():
+    """Saat isi haritasi, birlikte satilan urunler ve menu muhendisligi"""
+    if not analytics.is_available():
+        return jsonify({'success': False, 'error': 'Analiz icin numpy kurulu olmali'}), 503
     
-    current_user = User.query.get(session['user_id'])
-    if not current_user or current_user.role == 'waiter':
-        return jsonify({'success': False, 'error': 'Yetkiniz yok'}), 403
+    today = datetime.now().date()
+    try:
+        end_date = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if 'end' in request.args else today
+        start_date = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if 'start' in request.args else end_date.replace(day=1)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Tarih formati YYYY-AA-GG olmali'}), 400
+    if start_date > end_date:
+        return jsonify({'success': False, 'error': 'Baslangic tarihi bitisten sonra olamaz'}), 400
+    
+    result = analytics.get_analytics(
+        report_db.session,
+        start_date,
+        end_date,
+        min_support=request.args.get('min_support', 0.01, type=float),
+        pair_limit=request.args.get('limit', 20, type=int)
+    )
+    return jsonify({'success': True, 'data': result})
 
-    orders = Order.query.filter_by(status='paid').order_by(Order.closed_at.desc()).limit(100).all()
-    return jsonify({'success': True, 'data': [o.to_dict() for o in orders]})
 
+@app.route('/api/reports/kitchen-latency', methods=['GET'])
+@manager_required
+@coalesced
+def get_kitchen_latency_report():
+    """Fis gecikmesi yuzdelikleri: reyon, yazici ve saat bazinda (saniye).
+
+    ?start=&end= (gun, varsayilan bugun) ya da servis sirasinda ?minutes=60
+    """
+    now = datetime.now()
+    try:
+        if 'minutes' in request.args:
+            start, end = now - timedelta(minutes=int(request.args['minutes'])), now
+        else:
+            end_date = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if 'end' in request.args else now.date()
+            start_date = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if 'start' in request.args else end_date
+            start, end = latency.day_range(start_date, end_date)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Tarih formati YYYY-AA-GG, dakika tam sayi olmali'}), 400
+    if start > end:
+        return jsonify({'success': False, 'error': 'Baslangic tarihi bitisten sonra olamaz'}), 400
+    
+    return jsonify({'success': True, 'data': latency.compute(report_db.session, start, end)})
 
 
 # ============== PRINTER API ==============
@@ -897,12 +2574,470 @@ def update_settings():
 
 
 
+# ============== CHANGES API ==============
+
+@app.route('/api/changes', methods=['GET'])
+@login_required
+@coalesced
+def get_changes():
+    """?since=<seq> sonrasi degisen satirlar ve silinenler (tombstone).
+
+    since cok eskiyse (gunluk budanmis) ya da verilmediyse tam goruntu doner.
+    """
+    since = request.args.get('since', 0, type=int)
+    
+    # Sira numarasi veriden once okunur; arada gelen degisiklikler bir
+    # sonraki istekte tekrar gelir (istemci tarafinda upsert, zararsiz)
+    first, last = change_log_bounds()
+    if since <= 0 or since > last or since < first - 1:
+        return jsonify({'success': True, 'data': change_snapshot(last)})
+    
+    latest = db.select(db.func.max(ChangeLog.seq)).where(
+        ChangeLog.seq > since, ChangeLog.seq <= last
+    ).group_by(ChangeLog.entity, ChangeLog.entity_id)
+    upserts, deletes = {}, {}
+    for entity, entity_id, deleted in db.session.query(
+        ChangeLog.entity, ChangeLog.entity_id, ChangeLog.deleted
+    ).filter(ChangeLog.seq.in_(latest)):
+        (deletes if deleted else upserts).setdefault(entity, []).append(entity_id)
+    
+    data = {'seq': last, 'reset': False, 'changes': {}, 'deleted': {}}
+    for entity, ids in upserts.items():
+        rows, missing = load_changed_rows(entity, ids)
+        data['changes'][entity] = rows
+        if missing:
+            deletes.setdefault(entity, []).extend(missing)
+    for entity, ids in deletes.items():
+        model = CHANGE_FEED[entity][0]
+        is_int = db.inspect(model).primary_key[0].type.python_type is int
+        data['deleted'][entity] = sorted({int(i) if is_int else i for i in ids})
+    return jsonify({'success': True, 'data': data})
+
+
+# ============== SYSTEM API ==============
+
+@app.route('/api/system/coalescing', methods=['GET'])
+@admin_required
+def get_coalescing_stats():
+    """Birlestirilen istek sayaclari: hesaplanan, bekleyip paylasan, onbellekten verilen"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'ttl': app.config['COALESCE_TTL'],
+            'generation': request_coalescer.generation,
+            'endpoints': request_coalescer.stats()
+        }
+    })
+
+
+@app.route('/api/system/live-state', methods=['GET'])
+@admin_required
+def get_live_state():
+    """Bellekteki canli durum: sayaclar ve veritabaniyla tutarlilik kontrolu"""
+    diff = live_state_diff()
+    return jsonify({
+        'success': True,
+        'data': {**live_state.stats(), 'consistent': not diff, 'mismatched_tables': diff}
+    })
+
+
+@app.route('/api/system/live-state/reload', methods=['POST'])
+@admin_required
+def reload_live_state():
+    """Canli durumu veritabanindan bastan yukle"""
+    load_live_state()
+    return jsonify({'success': True, 'data': live_state.stats()})
+
+
+@app.route('/api/system/backups', methods=['GET'])
+@admin_required
+def get_backups():
+    """Son yedeklemenin zamani, suresi ve boyutu; mevcut yedekler"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'directory': backup_manager.directory,
+            'interval': backup_manager.interval,
+            'keep': backup_manager.keep,
+            'compress': backup_manager.compress,
+            'running': backup_manager.running,
+            'next_in': round(backup_manager.seconds_until_due()) if backup_manager.interval > 0 else None,
+            'last': backup_manager.last(),
+            'backups': backup_manager.list()
+        }
+    })
+
+
+@app.route('/api/system/backups', methods=['POST'])
+@admin_required
+def create_backup():
+    """Hemen yedek al"""
+    status = backup_manager.run('manual')
+    if status is None:
+        return jsonify({'success': False, 'error': 'Su anda baska bir yedekleme calisiyor'}), 409
+    if status['error']:
+        return jsonify({'success': False, 'error': status['error'], 'data': status}), 500
+    return jsonify({'success': True, 'data': status})
+
+
+@app.cli.command('backup')
+def backup_command():
+    """Calisan veritabaninin yedegini al"""
+    status = backup_manager.run('cli')
+    if status is None:
+        raise click.ClickException('Su anda baska bir yedekleme calisiyor')
+    if status['error']:
+        raise click.ClickException(status['error'])
+    print(f"{status['file']}: {status['size']} bayt, {status['duration_ms']} ms")
+
+
+@app.cli.command('restore-backup')
+@click.argument('backup_file')
+@click.option('--verify-only', is_flag=True, help='Sadece yedegi dogrula, geri yukleme')
+@click.option('--yes', is_flag=True, help='Onay sorma')
+def restore_backup_command(backup_file, verify_only, yes):
+    """Yedegi dogrulayip veritabanina geri yukle (once mevcut hali yedeklenir)"""
+    path = backup_file
+    if not os.path.exists(path):
+        path = os.path.join(backup_manager.directory, backup_file)
+    if not os.path.exists(path):
+        raise click.ClickException(f'Yedek bulunamadi: {backup_file}')
+    
+    plain_path, temporary = backups.extract(path, backup_manager.directory)
+    try:
+        counts = backups.verify_database(plain_path)
+    except backups.BackupError as e:
+        raise click.ClickException(str(e))
+    finally:
+        if temporary:
+            os.remove(plain_path)
+    print(f"{os.path.basename(path)} dogrulandi: " + ', '.join(f'{k}={v}' for k, v in counts.items()))
+    if verify_only:
+        return
+    
+    if not yes:
+        click.confirm(f'{backup_manager.source_path} bu yedekle degistirilecek. Uygulama durduruldu mu?', abort=True)
+    # Eskiler silinmez: geri yuklenen yedek en eskisi olabilir
+    status = backup_manager.run('pre-restore', rotate=False)
+    if status is None or status['error']:
+        raise click.ClickException('Geri yukleme oncesi yedek alinamadi')
+    print(f"Mevcut veritabani yedeklendi: {status['file']}")
+    try:
+        backups.restore_database(path, backup_manager.source_path)
+    except backups.BackupError as e:
+        raise click.ClickException(str(e))
+    print('Geri yukleme tamamlandi ve dogrulandi')
+
+
+# ============== MAINTENANCE JOBS ==============
+# Gun sonu kapanisi ve veritabani bakimi, HTTP isteklerinin disinda arka
+# planda calisir. Isler sunucu bosta iken (SCHEDULER_IDLE_SECONDS boyunca
+# istek gelmemisken) baslar; yogunluk surerse en fazla bir saat ertelenir.
+
+request_activity = {'active': 0, 'last': 0.0}
+request_activity_lock = threading.Lock()
+
+
+@app.before_request
+def mark_request_start():
+    with request_activity_lock:
+        request_activity['active'] += 1
+
+
+@app.teardown_request
+def mark_request_end(exc=None):
+    with request_activity_lock:
+        request_activity['active'] = max(0, request_activity['active'] - 1)
+        request_activity['last'] = time.monotonic()
+
+
+def server_is_idle():
+    with request_activity_lock:
+        return (request_activity['active'] == 0 and
+                time.monotonic() - request_activity['last'] >= app.config['SCHEDULER_IDLE_SECONDS'])
+
+
+def close_days():
+    """Kapanmamis gecmis gunleri daily_closes'a dondur (Z raporu).
+
+    Toplamlar rapor baglantisindan okunur; son kapanan gun ve yazim ana
+    oturumdan (ayni gun iki kez kapanmasin).
+    """
+    today = datetime.combine(date.today(), datetime.min.time())
+    last_closed = db.session.query(db.func.max(DailyClose.date)).scalar()
+    start = datetime.combine(last_closed + timedelta(days=1), datetime.min.time()) if last_closed else None
+    
+    day = db.func.date(Order.closed_at)
+    in_range = [Order.closed_at < today, Order.status.in_(('paid', 'cancelled'))]
+    if start is not None:
+        in_range.append(Order.closed_at >= start)
+    paid = Order.status == 'paid'
+    reports = report_db.session
+    rows = reports.query(
+        day,
+        db.func.count(db.case((paid, Order.id))),
+        db.func.count(db.case((Order.status == 'cancelled', Order.id))),
+        db.func.coalesce(db.func.sum(db.case((paid, Order.subtotal), else_=0)), 0),
+        db.func.coalesce(db.func.sum(db.case((paid, Order.tax_amount), else_=0)), 0),
+        db.func.coalesce(db.func.sum(db.case((paid, Order.discount_amount), else_=0)), 0),
+        db.func.coalesce(db.func.sum(db.case((paid, Order.total), else_=0)), 0),
+        db.func.coalesce(db.func.sum(db.case((paid & (Order.payment_method == 'cash'), Order.total), else_=0)), 0),
+        db.func.coalesce(db.func.sum(db.case((paid & (Order.payment_method == 'card'), Order.total), else_=0)), 0)
+    ).filter(*in_range).group_by(day).all()
+    items = dict(reports.query(day, db.func.sum(OrderItem.quantity)).join(
+        Order, OrderItem.order_id == Order.id
+    ).filter(paid, *in_range).group_by(day).all())
+    
+    closed = []
+    for (day_str, order_count, cancelled_count, subtotal, tax_amount, discount_amount,
+         revenue, cash_total, card_total) in rows:
+        db.session.add(DailyClose(
+            date=date.fromisoformat(day_str),
+            order_count=order_count,
+            cancelled_count=cancelled_count,
+            item_count=items.get(day_str) or 0,
+            subtotal=subtotal,
+            tax_amount=tax_amount,
+            discount_amount=discount_amount,
+            revenue=revenue,
+            cash_total=cash_total,
+            card_total=card_total
+        ))
+        closed.append(day_str)
+    db.session.commit()
+    return {'closed_days': closed}
+
+
+def cancel_stale_orders():
+    """Uzun suredir acik kalan bos siparisleri iptal et; urunlu olanlari sadece raporla"""
+    cutoff = datetime.now() - timedelta(hours=app.config['STALE_ORDER_HOURS'])
+    stale = Order.query.filter(Order.status == 'open', Order.opened_at < cutoff).order_by(Order.id).all()
+    cancelled, kept = [], []
+    for order in stale:
+        if order.items:
+            kept.append(order.id)
+            continue
+        order.status = 'cancelled'
+        order.closed_at = datetime.now()
+        if not claim_order_version(order):
+            db.session.rollback()  # Bu arada biri degistirdi; dokunma
+            continue
+        if order.table and not Order.query.filter(
+                Order.table_id == order.table_id, Order.status == 'open', Order.id != order.id).count():
+            order.table.status = 'available'
+            order.table.opened_at = None
+        release_reservation(order)
+        record_order_event('cancelled', order, reason='stale')
+        db.session.commit()
+        cancelled.append(order.id)
+    return {'cancelled': cancelled, 'stale_with_items': kept}
+
+
+def optimize_database():
+    """Sorgu planlayici istatistiklerini gerekirse guncelle ve WAL dosyasini kucult"""
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA optimize')
+        busy, wal_pages, checkpointed = conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').one()
+    return {'wal_pages': wal_pages, 'checkpointed': checkpointed, 'busy': bool(busy)}
+
+
+def analyze_database():
+    """Tum tablolar icin istatistikleri bastan topla"""
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+    return {}
+
+
+def vacuum_database():
+    """Bos sayfalari parca parca dosyadan at (incremental vacuum)"""
+    with db.engine.connect() as conn:
+        mode = conn.exec_driver_sql('PRAGMA auto_vacuum').scalar()
+        free_before = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+        if mode != 2:
+            # Tek seferlik: INCREMENTAL moda gecis tam VACUUM gerektirir
+            conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.exec_driver_sql('VACUUM')
+        else:
+            # execute() her adimda tek sayfa bosaltir; executescript sonuna kadar calistirir
+            conn.connection.dbapi_connection.executescript(
+                f"PRAGMA incremental_vacuum({int(app.config['VACUUM_PAGES'])});")
+        free_after = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+    return {'full_vacuum': mode != 2, 'freed_pages': free_before - free_after, 'free_pages': free_after}
+
+
+MAINTENANCE_JOBS = {
+    'nightly-close': close_days,
+    'stale-orders': cancel_stale_orders,
+    'optimize': optimize_database,
+    'analyze': analyze_database,
+    'incremental-vacuum': vacuum_database,
+}
+
+
+def expire_stale_job_runs(name):
+    """JOB_TIMEOUT_MINUTES'i asan 'running' kayitlari (cokmus worker) basarisiz say"""
+    now = datetime.now()
+    cutoff = now - timedelta(minutes=app.config['JOB_TIMEOUT_MINUTES'])
+    JobRun.query.filter(
+        JobRun.job == name, JobRun.status == 'running', JobRun.started_at < cutoff
+    ).update({
+        JobRun.status: 'failed',
+        JobRun.error: 'Zaman asimi: is yarim kaldi',
+        JobRun.finished_at: now
+    }, synchronize_session=False)
+
+
+def claim_job_run(job, slot):
+    """(is, zaman) kaydini ekleyerek isi sahiplen; yeni kaydin id'si ya da None.
+
+    Ayni is baska bir yerde calisiyorsa ('running' kaydi varsa) ya da bu zaman
+    dilimi alinmissa None doner. Kontrol ve ekleme tek INSERT ... SELECT
+    ifadesidir; SQLite yazma kilidi altinda atomiktir.
+    """
+    expire_stale_job_runs(job.name)
+    running = db.select(JobRun.id).where(JobRun.job == job.name, JobRun.status == 'running')
+    values = db.select(
+        db.literal(job.name, JobRun.job.type),
+        db.literal(slot, JobRun.scheduled_for.type),
+        db.literal(datetime.now(), JobRun.started_at.type),
+        db.literal('running', JobRun.status.type),
+        db.literal(f'{socket.gethostname()}:{os.getpid()}', JobRun.worker.type)
+    ).where(~running.exists())
+    try:
+        result = db.session.execute(db.insert(JobRun).from_select(
+            ['job', 'scheduled_for', 'started_at', 'status', 'worker'], values
+        ))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return None
+    return result.lastrowid if result.rowcount == 1 else None
+
+
+def run_job(job, slot):
+    """Isi sahiplen, calistir ve gecmise yaz; is calisiyorsa / sahiplenildiyse None"""
+    with app.app_context():
+        run_id = claim_job_run(job, slot)
+        if run_id is None:
+            return None
+        
+        started = time.perf_counter()
+        try:
+            result, error = job.func(), None
+        except Exception as e:
+            db.session.rollback()
+            result, error = None, str(e)
+        
+        run = JobRun.query.get(run_id)
+        run.status = 'failed' if error else 'success'
+        run.result = json.dumps(result, default=str) if result is not None else None
+        run.error = error
+        run.finished_at = datetime.now()
+        run.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        db.session.commit()
+        return run.to_dict()
+
+
+maintenance = scheduler.Scheduler(run_job, is_idle=server_is_idle)
+
+
+def schedule_maintenance_jobs():
+    """SCHEDULE ayarindaki isleri zamanlayiciya (yeniden) kaydet"""
+    maintenance.jobs.clear()
+    for job_name, job_cron in app.config['SCHEDULE'].items():
+        maintenance.add(job_name, job_cron, MAINTENANCE_JOBS[job_name])
+
+
+schedule_maintenance_jobs()
+
+
+@app.route('/api/system/jobs', methods=['GET'])
+@admin_required
+def get_jobs():
+    """Zamanlanmis bakim isleri ve her birinin son calismasi"""
+    latest = {}
+    for run in JobRun.query.order_by(JobRun.id.desc()).limit(200):
+        latest.setdefault(run.job, run.to_dict())
+    jobs = [{**job, 'last_run': latest.get(job['name'])} for job in maintenance.describe()]
+    return jsonify({'success': True, 'data': jobs})
+
+
+@app.route('/api/system/jobs/history', methods=['GET'])
+@admin_required
+def get_job_history():
+    """Is gecmisi (?job= ile suzulebilir)"""
+    query = JobRun.query.order_by(JobRun.id.desc())
+    if request.args.get('job'):
+        query = query.filter_by(job=request.args['job'])
+    runs = query.limit(request.args.get('limit', 50, type=int)).all()
+    return jsonify({'success': True, 'data': [r.to_dict() for r in runs]})
+
+
+@app.route('/api/system/jobs/<name>/run', methods=['POST'])
+@admin_required
+def run_job_now(name):
+    """Bakim isini hemen calistir"""
+    job = maintenance.jobs.get(name)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Bilinmeyen is'}), 404
+    run = run_job(job, datetime.now())
+    if run is None:
+        return jsonify({'success': False, 'error': 'Is su anda calisiyor'}), 409
+    return jsonify({'success': run['status'] == 'success', 'data': run})
+
+
+@app.route('/api/reports/z-close', methods=['GET'])
+@manager_required
+def get_daily_closes():
+    """Gun sonu kapanislari (?start=&end=, varsayilan son 30 gun)"""
+    today = datetime.now().date()
+    try:
+        end_date = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if 'end' in request.args else today
+        start_date = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if 'start' in request.args else end_date - timedelta(days=30)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Tarih formati YYYY-AA-GG olmali'}), 400
+    closes = report_db.session.query(DailyClose).filter(
+        DailyClose.date >= start_date, DailyClose.date <= end_date
+    ).order_by(DailyClose.date).all()
+    return jsonify({'success': True, 'data': [c.to_dict() for c in closes]})
+
+
+@app.cli.command('run-job')
+@click.argument('name')
+def run_job_command(name):
+    """Bakim isini hemen calistir (nightly-close, stale-orders, optimize, analyze, incremental-vacuum)"""
+    job = maintenance.jobs.get(name)
+    if job is None:
+        raise click.ClickException(f"Bilinmeyen is: {name} ({', '.join(maintenance.jobs)})")
+    run = run_job(job, datetime.now())
+    if run is None:
+        raise click.ClickException('Is su anda calisiyor')
+    print(json.dumps(run, ensure_ascii=False, indent=2))
+
+
 # ============== PRINTING LOGIC ==============
 
+escpos_printer = None  # python-escpos; load_escpos() ile bir kez yuklenir, False: kurulu degil
+
+
+def load_escpos():
+    global escpos_printer
+    if escpos_printer is None:
+        try:
+            from escpos import printer as module
+            escpos_printer = module
+        except ImportError:
+            escpos_printer = False
+    return escpos_printer
+
+
 def safe_print(printer, content):
     """Guvenli yazdirma fonksiyonu"""
     try:
-        from escpos.printer import Network, Dummy
+        escpos = load_escpos()
+        if not escpos:
+            raise ImportError('escpos')
+        Network = escpos.Network
         
         p = None
         if printer.type == 'network':
@@ -1019,14 +3154,21 @@ Saat: {datetime.now().strftime('%H:%M')}
         content += "\n--------------------------------\n\n"
         
         # Yazdir veya Demo Yazdir
+        sent_at = datetime.now()
         success = safe_print(printer, content)
         if not success:
             print(f"DEMO PRINT ({printer.name} - {station.name}):\n{content}")
             
         # Yazdirildi olarak isaretle (Hata olsa bile isaretle ki tekrar tekrar denemeyelim, veya UI'dan tekrar tetiklenebilir olsun)
         # Gercek senaryoda sadece success ise isaretlenmeli. Burada demo oldugu icin isaretliyoruz.
+        # printed_at sadece yazici basariyla bastiysa dolar
+        printed_at = datetime.now() if success else None
         for item in items:
             item.is_printed = True
+            item.print_sent_at = sent_at
+            item.printed_at = printed_at
+            item.station_id = station.id
+            item.printer_id = printer.id
             
         printed_count += 1
         
@@ -1035,7 +3177,7 @@ Saat: {datetime.now().strftime('%H:%M')}
     return jsonify({
         'success': True, 
         'message': f'{printed_count} reyon fisi yazdirildi',
-        'data': order.to_dict()
+        'data': live_order_dict(order)
     })
 
 
@@ -1049,6 +3191,44 @@ def health_check():
     })
 
 
+# ============== STARTUP ==============
+# Uygulama, eklentiler ve route'lar bu modul import edilirken kurulur;
+# prepare_app() sadece sema kontrolunu yapar, agir kutuphaneler ilk
+# istekten sonra arka planda yuklenir.
+
+warm_up_state = {'started': False, 'finished_ms': None}
+warm_up_lock = threading.Lock()
+
+
+def warm_up():
+    """Agir kutuphaneleri bir kez yukle; ilk rapor / yazdirma istegi beklemesin"""
+    started = time.perf_counter()
+    analytics.load_numpy()
+    load_escpos()
+    warm_up_state['finished_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def start_warm_up():
+    """Sunucu dinlemeye basladiktan sonra (ilk istekte) arka planda isit"""
+    with warm_up_lock:
+        if warm_up_state['started']:
+            return
+        warm_up_state['started'] = True
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
+
+def prepare_app():
+    """Sema kontrolunu yap ve modul seviyesindeki uygulamayi dondur.
+
+    WSGI sunuculari icin: gunicorn 'main:prepare_app()'. Veritabani yolu
+    ADISYO_DB ortam degiskeninden okunur. Kayitli sema parmak izi tutuyorsa
+    kurulum atlanir.
+    """
+    with app.app_context():
+        init_database()
+    return app
+
+
 # ============== MAIN ==============
 
 if __name__ == '__main__':
@@ -1066,8 +3246,7 @@ if __name__ == '__main__':
     print("=" * 55)
     print("")
     
-    with app.app_context():
-        init_database()
+    prepare_app()
     
     app.run(
         host='0.0.0.0',
@@ -0,0 +1,214 @@
+"""
+Adisyo POS Sistemi - Toplu Menu Ice / Disa Aktarma
+Kategoriler, reyonlar ve menu urunleri (fiyatlar dahil) icin JSON / CSV
+okuma, yazma, dogrulama ve mevcut menuyle fark (diff) hesaplama.
+Urunler degismeyen 'code' alani ile eslestirilir.
+
+JSON bicimi:
+    {"categories": [{"key", "name", "icon"}],
+     "stations":   [{"name", "printer"}],
+     "items":      [{"code", "name", "price", "category", "station", "available", "stock"}]}
+
+CSV bicimi sadece urun satirlarindan olusur; kategoriler 'category' (ve
+istege bagli 'category_name') kolonundan, reyonlar 'station' kolonundan olusur.
+"""
+
+import csv
+import io
+import json
+import math
+
+
+ITEM_FIELDS = ['code', 'name', 'price', 'category', 'station', 'available', 'stock']
+CSV_FIELDS = ITEM_FIELDS + ['category_name']
+
+TRUE_VALUES = {'1', 'true', 'evet', 'yes', 'e', 'x'}
+FALSE_VALUES = {'0', 'false', 'hayir', 'no', 'h', ''}
+
+# Bos (None) gelirse mevcut degeri koruyan alanlar (CSV'de kolonlari yok)
+KEEP_IF_EMPTY = {'categories': ('icon',), 'stations': ('printer',), 'items': ()}
+
+
+def parse(content, fmt):
+    """Dosya icerigini ortak yapiya donustur"""
+    if fmt == 'json':
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError('JSON kok degeri nesne olmali')
+        result = {}
+        for section in ('categories', 'stations', 'items'):
+            rows = data.get(section) or []
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError(f"'{section}' nesne listesi olmali")
+            result[section] = rows
+        return result
+
+    if fmt == 'csv':
+        reader = csv.DictReader(io.StringIO(content.lstrip('﻿')))
+        items, categories = [], {}
+        for row in reader:
+            row = {k.strip(): (v or '').strip() for k, v in row.items() if k}
+            if row.get('category') and row.get('category_name'):
+                categories[row['category']] = {'key': row['category'], 'name': row['category_name']}
+            items.append({k: row.get(k) for k in ITEM_FIELDS})
+        return {'categories': list(categories.values()), 'stations': [], 'items': items}
+
+    raise ValueError(f'Desteklenmeyen bicim: {fmt}')
+
+
+def _parse_bool(value, default=True):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def validate(data, category_keys, station_names):
+    """Tum dosyayi dogrula. (temiz veri, hata listesi) dondurur.
+
+    category_keys / station_names: veritabaninda mevcut olanlar.
+    """
+    errors = []
+    clean = {'categories': [], 'stations': [], 'items': []}
+
+    known_categories = set(category_keys)
+    for i, cat in enumerate(data['categories'], 1):
+        key = str(cat.get('key') or '').strip()
+        if not key:
+            errors.append(f'Kategori {i}: key gerekli')
+            continue
+        clean['categories'].append({
+            'key': key,
+            'name': str(cat.get('name') or key).strip(),
+            'icon': cat.get('icon') or None,
+        })
+        known_categories.add(key)
+
+    known_stations = set(station_names)
+    for i, station in enumerate(data['stations'], 1):
+        name = str(station.get('name') or '').strip()
+        if not name:
+            errors.append(f'Reyon {i}: ad gerekli')
+            continue
+        clean['stations'].append({'name': name, 'printer': station.get('printer') or None})
+        known_stations.add(name)
+
+    seen_codes = set()
+    for i, item in enumerate(data['items'], 1):
+        row = f'Satir {i}'
+        code = str(item.get('code') or '').strip()
+        name = str(item.get('name') or '').strip()
+        if not code:
+            errors.append(f'{row}: code gerekli')
+            continue
+        row = f'{row} ({code})'
+        if code in seen_codes:
+            errors.append(f'{row}: code dosyada birden fazla kez var')
+            continue
+        seen_codes.add(code)
+        if not name:
+            errors.append(f'{row}: ad gerekli')
+
+        try:
+            price = float(str(item.get('price')).replace(',', '.'))
+            if not math.isfinite(price) or price < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            errors.append(f'{row}: gecersiz fiyat {item.get("price")!r}')
+            price = None
+
+        category = str(item.get('category') or '').strip() or None
+        if category and category not in known_categories:
+            errors.append(f'{row}: bilinmeyen kategori {category!r}')
+
+        station = str(item.get('station') or '').strip() or None
+        if station and station not in known_stations:
+            # CSV'de reyonlar ayrica tanimlanmaz, urunle birlikte olusturulur
+            if data['stations']:
+                errors.append(f'{row}: bilinmeyen reyon {station!r}')
+            else:
+                clean['stations'].append({'name': station, 'printer': None})
+                known_stations.add(station)
+
+        try:
+            available = _parse_bool(item.get('available'))
+        except ValueError:
+            errors.append(f'{row}: gecersiz available {item.get("available")!r}')
+            available = True
+
+        stock = item.get('stock')
+        if stock in (None, ''):
+            stock = None
+        else:
+            try:
+                stock = int(stock)
+                if stock < 0:
+                    raise ValueError
+            except (TypeError, ValueError):
+                errors.append(f'{row}: gecersiz stok {stock!r}')
+                stock = None
+
+        clean['items'].append({
+            'code': code,
+            'name': name,
+            'price': price,
+            'category': category,
+            'station': station,
+            'available': available,
+            'stock': stock,
+        })
+
+    return clean, errors
+
+
+def diff(clean, current):
+    """Yuklenecek veri ile mevcut menu arasindaki fark.
+
+    current: {'categories': {key: dict}, 'stations': {name: dict}, 'items': {code: dict}}
+    """
+    result = {}
+    for section, key_field in (('categories', 'key'), ('stations', 'name'), ('items', 'code')):
+        created, updated, unchanged = [], [], 0
+        for row in clean[section]:
+            existing = current[section].get(row[key_field])
+            if existing is None:
+                created.append(row[key_field])
+                continue
+            keep = KEEP_IF_EMPTY[section]
+            changes = {f: [existing.get(f), v] for f, v in row.items()
+                       if f != key_field and existing.get(f) != v and not (v is None and f in keep)}
+            if changes:
+                updated.append({key_field: row[key_field], 'changes': changes})
+            else:
+                unchanged += 1
+        result[section] = {'create': created, 'update': updated, 'unchanged': unchanged}
+    return result
+
+
+def export(categories, stations, items, fmt):
+    """Menuyu JSON ya da CSV metni olarak yaz"""
+    if fmt == 'json':
+        return json.dumps({'categories': categories, 'stations': stations, 'items': items},
+                          ensure_ascii=False, indent=2)
+
+    if fmt == 'csv':
+        names = {c['key']: c['name'] for c in categories}
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for item in items:
+            writer.writerow({
+                **item,
+                'available': '1' if item['available'] else '0',
+                'stock': '' if item['stock'] is None else item['stock'],
+                'category_name': names.get(item['category'], ''),
+            })
+        return out.getvalue()
+
+    raise ValueError(f'Desteklenmeyen bicim: {fmt}')
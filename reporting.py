@@ -0,0 +1,115 @@
+"""
+Adisyo POS Sistemi - Rapor Okuma Yolu
+Raporlar ve disa aktarimlar siparis yazan oturumdan ayri, salt okunur bir
+SQLite baglantisi (mode=ro) uzerinden calisir; boylece uzun rapor sorgulari
+garsonlarin yazma islemlerini bekletmez.
+
+REPORTS_MAX_STALENESS = 0 (varsayilan): Ana veritabani WAL modunda acilir,
+    raporlar ayni dosyadan anlik goruntu (snapshot) okur, veri hic eskimez.
+REPORTS_MAX_STALENESS > 0: Raporlar ayri bir kopya dosyadan okunur. Kopya en
+    fazla bu kadar saniye eskidiginde SQLite backup API ile yenilenir.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+
+def _enable_wal(dbapi_connection, connection_record):
+    """Okuyucular yazicilari bloklamasin diye WAL modu"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.close()
+
+
+def _readonly_url(path):
+    return f'sqlite:///file:{quote(os.path.abspath(path))}?mode=ro&uri=true'
+
+
+class ReportDatabase:
+    """Raporlar icin salt okunur motor ve oturum"""
+
+    def __init__(self):
+        self.engine = None
+        self.source_path = None
+        self.replica_path = None
+        self.max_staleness = 0
+        self.refreshed_at = None
+        self._refresh_lock = threading.Lock()
+        self._session = None
+
+    def init_app(self, app, db):
+        app.config.setdefault('REPORTS_MAX_STALENESS', 0)
+        app.config.setdefault('REPORTS_REPLICA_PATH', None)
+
+        with app.app_context():
+            write_engine = db.engine
+        event.listen(write_engine, 'connect', _enable_wal)
+        # Ilk baglantida WAL moduna gec (mod dosyada kalicidir)
+        with write_engine.connect():
+            pass
+
+        self.source_path = write_engine.url.database
+        self.max_staleness = app.config['REPORTS_MAX_STALENESS']
+        if self.max_staleness > 0:
+            base, ext = os.path.splitext(self.source_path)
+            self.replica_path = app.config['REPORTS_REPLICA_PATH'] or f'{base}-reports{ext}'
+            read_path = self.replica_path
+        else:
+            read_path = self.source_path
+
+        self.engine = create_engine(_readonly_url(read_path))
+        self._session = scoped_session(sessionmaker(bind=self.engine))
+        app.teardown_appcontext(self._remove_session)
+
+    def _remove_session(self, exc=None):
+        if self._session is not None:
+            self._session.remove()
+
+    @property
+    def session(self):
+        """Rapor oturumu (gerekirse kopya once yenilenir)"""
+        if self.max_staleness > 0:
+            self.ensure_fresh()
+        return self._session
+
+    @property
+    def staleness(self):
+        """Okunan verinin yasi (saniye)"""
+        if self.max_staleness <= 0:
+            return 0.0
+        if self.refreshed_at is None:
+            return None
+        return time.monotonic() - self.refreshed_at
+
+    def ensure_fresh(self):
+        age = self.staleness
+        if age is not None and age <= self.max_staleness:
+            return
+        with self._refresh_lock:
+            age = self.staleness
+            if age is None or age > self.max_staleness:
+                self.refresh_replica()
+
+    def refresh_replica(self):
+        """Kopyayi SQLite online backup API ile kucuk adimlarla yenile"""
+        tmp_path = f'{self.replica_path}.tmp'
+        source = sqlite3.connect(f'file:{quote(os.path.abspath(self.source_path))}?mode=ro', uri=True)
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=256, sleep=0.001)
+            target.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            target.close()
+            source.close()
+
+        os.replace(tmp_path, self.replica_path)
+        # Eski dosyayi tutan havuz baglantilarini kapat
+        self._remove_session()
+        self.engine.dispose()
+        self.refreshed_at = time.monotonic()
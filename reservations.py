@@ -0,0 +1,97 @@
+"""
+Adisyo POS Sistemi - Rezervasyon Aralik Indeksi
+Masa bazinda bellek ici aralik indeksi. Her masanin aktif rezervasyonlari
+baslangic saatine gore sirali tutulur; masadaki en uzun rezervasyon suresi
+bilindigi icin bir zaman araligiyla cakisan kayitlar ikili arama ile
+(O(log n + k)) bulunur, tum rezervasyonlar taranmaz.
+"""
+
+import bisect
+import threading
+from datetime import timedelta
+
+
+ACTIVE_STATUSES = ('booked', 'seated')
+
+
+class _TableIntervals:
+    """Tek masanin rezervasyonlari (baslangica gore sirali)"""
+    __slots__ = ('starts', 'entries', 'max_length')
+
+    def __init__(self):
+        self.starts = []
+        self.entries = []  # (baslangic, bitis, rezervasyon id)
+        self.max_length = timedelta(0)
+
+    def add(self, start, end, reservation_id):
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.entries.insert(i, (start, end, reservation_id))
+        # Silmede kuculmez; buyuk kalmasi sadece taranan araligi genisletir
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, start, reservation_id):
+        i = bisect.bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.entries[i][2] == reservation_id:
+                del self.starts[i]
+                del self.entries[i]
+                return
+            i += 1
+
+    def overlapping(self, start, end):
+        """[start, end) ile cakisan kayitlar"""
+        lo = bisect.bisect_left(self.starts, start - self.max_length)
+        hi = bisect.bisect_left(self.starts, end)
+        return [entry for entry in self.entries[lo:hi] if entry[1] > start]
+
+
+class IntervalIndex:
+    """Aktif rezervasyonlar icin masa bazinda aralik indeksi"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._by_id = {}  # rezervasyon id -> (masa id, baslangic)
+
+    def build(self, rows):
+        """Indeksi bastan kur. rows: [(id, masa id, baslangic, bitis), ...]"""
+        with self._lock:
+            self._tables = {}
+            self._by_id = {}
+            for row in rows:
+                self._add(*row)
+
+    def _add(self, reservation_id, table_id, start, end):
+        self._tables.setdefault(table_id, _TableIntervals()).add(start, end, reservation_id)
+        self._by_id[reservation_id] = (table_id, start)
+
+    def _remove(self, reservation_id):
+        found = self._by_id.pop(reservation_id, None)
+        if found is not None:
+            table_id, start = found
+            self._tables[table_id].remove(start, reservation_id)
+
+    def upsert(self, reservation_id, table_id, start, end):
+        with self._lock:
+            self._remove(reservation_id)
+            self._add(reservation_id, table_id, start, end)
+
+    def remove(self, reservation_id):
+        with self._lock:
+            self._remove(reservation_id)
+
+    def overlapping(self, table_id, start, end):
+        """Masada [start, end) ile cakisan rezervasyonlar: [(baslangic, bitis, id)]"""
+        with self._lock:
+            intervals = self._tables.get(table_id)
+            return intervals.overlapping(start, end) if intervals else []
+
+    def busy_tables(self, start, end):
+        """[start, end) araliginda rezervasyonu olan masalar"""
+        with self._lock:
+            return {table_id for table_id, intervals in self._tables.items()
+                    if intervals.overlapping(start, end)}
+
+    def __len__(self):
+        return len(self._by_id)
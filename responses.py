@@ -0,0 +1,116 @@
+"""
+Adisyo POS Sistemi - Yanit Katmani
+Hizli JSON serilestirme (orjson varsa) ve Accept-Encoding'e gore
+gzip / brotli sikistirma.
+"""
+
+import gzip
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Standart kutuphaneye geri don
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'application/javascript',
+    'text/javascript',
+}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson varsa onu kullanan JSON saglayicisi, yoksa standart json.
+
+    Iki yol ayni ciktiyi uretir: anahtarlar sort_keys'e gore siralanir,
+    metin kacissiz UTF-8 yazilir (orjson gibi) ve datetime Flask'in
+    default'una birakilir.
+    """
+
+    ensure_ascii = False
+
+    def _dumps_bytes(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        # Ozel argumanlar (sort_keys, cls vb.) sadece standart json'da desteklenir
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        if orjson is None:
+            return super().dumps(obj, separators=(',', ':'))
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._dumps_bytes(obj, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _choose_encoding():
+    """Istemcinin kabul ettigi en iyi sikistirma yontemini sec"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """Esik degerin uzerindeki yanitlari sikistir"""
+    config = current_app.config
+
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    data = response.get_data()
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    elif encoding == 'gzip':
+        compressed = gzip.compress(data, compresslevel=config['COMPRESS_GZIP_LEVEL'])
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = len(compressed)
+    return response
+
+
+def init_app(app):
+    """Yanit katmanini uygulamaya bagla"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BROTLI_QUALITY', 4)
+
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
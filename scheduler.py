@@ -0,0 +1,161 @@
+"""
+Adisyo POS Sistemi - Bakim Zamanlayicisi
+Uygulama icinde cron benzeri zamanlanmis isler. Her is bir cron ifadesiyle
+(dakika saat gun ay haftanin-gunu) tanimlanir; arka plandaki tek bir is
+parcacigi zamani gelen isleri sirayla calistirir.
+
+Ayni isin ayni zaman dilimini birden fazla worker'in calistirmamasi runner'in
+gorevidir (main.py is gecmisi tablosuna benzersiz (is, zaman) satiri ekleyerek
+isi sahiplenir). off_peak isler sunucu bosta degilse max_delay dolana kadar
+ertelenir.
+
+    '30 4 * * *'    her gun 04:30
+    '0 5 * * 1'     pazartesi 05:00
+    '*/15 * * * *'  15 dakikada bir
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class CronError(ValueError):
+    pass
+
+
+# (en kucuk, en buyuk): dakika, saat, ayin gunu, ay, haftanin gunu (0 = pazar)
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f'Gecersiz adim: {step_text}')
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise CronError(f'Gecersiz aralik: {part}')
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = end = int(part)
+        else:
+            raise CronError(f'Gecersiz deger: {part}')
+        if start < low or end > high or start > end:
+            raise CronError(f'Aralik disi: {part} ({low}-{high})')
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class Cron:
+    """Cozumlenmis cron ifadesi"""
+    __slots__ = ('expr', 'minutes', 'hours', 'days', 'months', 'weekdays', '_any_day', '_any_weekday')
+
+    def __init__(self, expr):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise CronError(f'Cron ifadesi 5 alan olmali: {expr}')
+        self.expr = expr
+        (self.minutes, self.hours, self.days,
+         self.months, self.weekdays) = (_parse_field(p, *r) for p, r in zip(parts, FIELD_RANGES))
+        self._any_day = parts[2] == '*'
+        self._any_weekday = parts[4] == '*'
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        # Cron kurali: iki alan da kisitliysa biri tutmasi yeter
+        if not self._any_day and not self._any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment):
+        """moment'tan sonraki ilk eslesen dakika"""
+        moment = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=366 * 4)
+        while moment < limit:
+            if moment.month not in self.months:
+                year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+                moment = moment.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise CronError(f'Eslesen zaman yok: {self.expr}')
+
+
+class Job:
+    __slots__ = ('name', 'cron', 'func', 'off_peak', 'next_run')
+
+    def __init__(self, name, cron, func, off_peak):
+        self.name = name
+        self.cron = cron
+        self.func = func
+        self.off_peak = off_peak
+        self.next_run = None
+
+
+class Scheduler:
+    """Zamani gelen isleri runner(job, slot) ile calistiran arka plan dongusu.
+
+    is_idle(): sunucu bosta mi; off_peak isler bosta degilken ertelenir
+    max_delay: bu kadar ertelenen is yine de calistirilir
+    """
+
+    def __init__(self, runner, is_idle=None, max_delay=timedelta(hours=1), tick=20):
+        self.runner = runner
+        self.is_idle = is_idle or (lambda: True)
+        self.max_delay = max_delay
+        self.tick = tick
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, name, expr, func, off_peak=True):
+        job = Job(name, Cron(expr), func, off_peak)
+        job.next_run = job.cron.next_after(datetime.now())
+        self.jobs[name] = job
+        return job
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or not self.jobs:
+                return
+            self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.tick)
+            try:
+                self.run_pending(datetime.now())
+            except Exception as e:
+                print(f"Zamanlayici hatasi: {e}")
+
+    def run_pending(self, now):
+        """Zamani gelmis isleri calistir; calistirilan is adlari"""
+        ran = []
+        for job in list(self.jobs.values()):
+            if job.next_run > now:
+                continue
+            if job.off_peak and now < job.next_run + self.max_delay and not self.is_idle():
+                continue  # Yogunluk gecince tekrar denenir
+            slot = job.next_run
+            job.next_run = job.cron.next_after(now)
+            self.runner(job, slot)
+            ran.append(job.name)
+        return ran
+
+    def describe(self):
+        return [{'name': job.name, 'schedule': job.cron.expr, 'off_peak': job.off_peak,
+                 'next_run': job.next_run.isoformat()} for job in self.jobs.values()]
@@ -0,0 +1,218 @@
+"""
+Adisyo POS Sistemi - Menu Arama Indeksi
+Bellek ici onek / hata toleransli arama. Turkce karakterler katlanir
+("kunefe" -> "Künefe"), tek harf hatasi (eksik, fazla, yanlis, yer
+degistirmis harf) tolere edilir. Indeks menu CRUD islemlerinde urun bazinda
+guncellenir, tum menuyu yeniden kurmaya gerek kalmaz.
+
+Stok ve satis durumu her sipariste degistigi icin indekste tutulmaz; arama
+sonucuna sorgu aninda veritabanindan eklenir (search(..., state=...)).
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+
+
+TURKISH_FOLD = str.maketrans({
+    'ç': 'c', 'Ç': 'c', 'ğ': 'g', 'Ğ': 'g', 'ı': 'i', 'I': 'i', 'İ': 'i',
+    'ö': 'o', 'Ö': 'o', 'ş': 's', 'Ş': 's', 'ü': 'u', 'Ü': 'u',
+})
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+MIN_FUZZY_LENGTH = 3  # Daha kisa kelimelerde hata toleransi yok
+
+# Eslesme puanlari
+EXACT, PREFIX, FUZZY = 3, 2, 1
+NAME_WEIGHT, CATEGORY_WEIGHT = 2, 1
+
+VOLATILE_FIELDS = ('available', 'stock')  # Indekste tutulmayan alanlar
+
+
+def fold(text):
+    """Turkce karakterleri ve aksanlari ASCII kucuk harfe katla"""
+    text = (text or '').translate(TURKISH_FOLD)
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(fold(text))
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+@lru_cache(maxsize=65536)
+def _variants(prefix):
+    """Onekin tek harf silinmis varyantlari ve kendisi"""
+    return tuple(_deletes(prefix) | {prefix})
+
+
+@lru_cache(maxsize=65536)
+def _prefixes(token):
+    return tuple(token[:end] for end in range(1, len(token) + 1))
+
+
+def _within_one_edit(a, b):
+    """a ile b arasinda en fazla bir duzenleme (ekleme, silme, degistirme, yer degistirme) var mi"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return (len(diff) == 2 and diff[1] == diff[0] + 1
+                and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if la > lb:
+        a, b = b, a
+    # b, a'dan bir harf fazla
+    for i in range(len(a)):
+        if a[i] != b[i]:
+            return a[i:] == b[i + 1:]
+    return True
+
+
+class _FieldIndex:
+    """Tek bir alan (urun adi veya kategori) icin kelime indeksi"""
+
+    def __init__(self):
+        self.exact = defaultdict(set)    # kelime -> urun id
+        self.prefix = defaultdict(set)   # onek -> urun id
+        self.fuzzy = defaultdict(set)    # silinmis varyant -> onekler
+        self.tokens = {}                 # urun id -> kelimeler
+
+    def add(self, item_id, text):
+        tokens = set(tokenize(text))
+        self.tokens[item_id] = tokens
+        for token in tokens:
+            self.exact[token].add(item_id)
+            for prefix in _prefixes(token):
+                ids = self.prefix[prefix]
+                # Varyantlar sadece onek ilk kez goruldugunde eklenir
+                if not ids and len(prefix) >= MIN_FUZZY_LENGTH:
+                    for variant in _variants(prefix):
+                        self.fuzzy[variant].add(prefix)
+                ids.add(item_id)
+
+    def remove(self, item_id):
+        for token in self.tokens.pop(item_id, ()):
+            _discard(self.exact, token, item_id)
+            for prefix in _prefixes(token):
+                if _discard(self.prefix, prefix, item_id) and len(prefix) >= MIN_FUZZY_LENGTH:
+                    for variant in _variants(prefix):
+                        _discard(self.fuzzy, variant, prefix)
+
+    def match(self, term):
+        """Terimle eslesen urunler: {id: puan}"""
+        scores = {}
+        if len(term) >= MIN_FUZZY_LENGTH:
+            candidates = set()
+            for variant in _deletes(term) | {term}:
+                candidates |= self.fuzzy.get(variant, set())
+            for prefix in candidates:
+                if _within_one_edit(term, prefix):
+                    for item_id in self.prefix.get(prefix, ()):
+                        scores[item_id] = FUZZY
+        for item_id in self.prefix.get(term, ()):
+            scores[item_id] = PREFIX
+        for item_id in self.exact.get(term, ()):
+            scores[item_id] = EXACT
+        return scores
+
+
+def _discard(mapping, key, value):
+    """Degeri sil; anahtar bosaldiysa kaldirip True dondur"""
+    values = mapping.get(key)
+    if values is None:
+        return False
+    values.discard(value)
+    if values:
+        return False
+    del mapping[key]
+    return True
+
+
+class MenuSearchIndex:
+    """Menu urunleri icin bellek ici arama indeksi"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self.docs = {}
+        self._name = _FieldIndex()
+        self._category = _FieldIndex()
+
+    def build(self, entries):
+        """Indeksi bastan kur. entries: [(urun dict, kategori adi), ...]"""
+        with self._lock:
+            self._reset()
+            for doc, category_name in entries:
+                self._add(doc, category_name)
+            self.ready = True
+
+    def _add(self, doc, category_name):
+        item_id = doc['id']
+        self.docs[item_id] = {k: v for k, v in doc.items() if k not in VOLATILE_FIELDS}
+        self._name.add(item_id, doc['name'])
+        self._category.add(item_id, f"{category_name or ''} {doc.get('category') or ''}")
+
+    def _remove(self, item_id):
+        self.docs.pop(item_id, None)
+        self._name.remove(item_id)
+        self._category.remove(item_id)
+
+    def upsert(self, doc, category_name):
+        with self._lock:
+            self._remove(doc['id'])
+            self._add(doc, category_name)
+
+    def remove(self, item_id):
+        with self._lock:
+            self._remove(item_id)
+
+    def search(self, query, limit=20, available_only=False, state=None):
+        """Sorguyla eslesen urunler, en iyi eslesme once.
+
+        state(ids) -> {id: {'available': ..., 'stock': ...}}: anlik alanlar.
+        Donmeyen id'ler (bu arada silinmis urunler) sonuca girmez.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            total = None
+            for term in terms:
+                scores = {}
+                for item_id, score in self._category.match(term).items():
+                    scores[item_id] = score * CATEGORY_WEIGHT
+                for item_id, score in self._name.match(term).items():
+                    scores[item_id] = max(scores.get(item_id, 0), score * NAME_WEIGHT)
+
+                # Tum terimler eslesmeli
+                if total is None:
+                    total = scores
+                else:
+                    total = {i: s + scores[i] for i, s in total.items() if i in scores}
+                if not total:
+                    return []
+
+            docs = [(score, self.docs[i]) for i, score in total.items()]
+
+        if state is not None:
+            current = state([doc['id'] for _, doc in docs])
+            docs = [(score, {**doc, **current[doc['id']]}) for score, doc in docs if doc['id'] in current]
+        if available_only:
+            docs = [(score, doc) for score, doc in docs if doc.get('available', True)]
+        docs.sort(key=lambda d: (-d[0], not d[1].get('available', True), fold(d[1]['name'])))
+        return [doc for _, doc in docs[:limit]]
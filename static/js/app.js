@@ -14,6 +14,7 @@ const state = {
     categories: [],
     activeTableId: null,
     activeOrderId: null,
+    activeOrder: null,
     activeCategory: 'main',
     paymentData: {
         discountType: null,
@@ -72,6 +73,127 @@ async function api(endpoint, options = {}) {
     return response.json();
 }
 
+// Siparis degisiklikleri: beklenen surumu gonderir, 409 (cakisma) gelirse
+// sunucunun dondurdugu guncel siparisle govdeyi yeniden olusturup tekrar dener.
+// buildBody(order) null donerse islem iptal edilir.
+async function orderApi(endpoint, method, buildBody, { retries = 2 } = {}) {
+    for (let attempt = 0; ; attempt++) {
+        const body = buildBody(state.activeOrder);
+        if (body === null) return { success: false };
+
+        const res = await api(endpoint, {
+            method,
+            body: JSON.stringify({ ...body, version: state.activeOrder ? state.activeOrder.version : undefined })
+        });
+
+        if (!res.conflict) return res;
+
+        if (res.data) renderCart(res.data);
+        if (attempt >= retries || !res.data || res.data.status !== 'open') {
+            showToast('Sipariş başka bir cihazda değiştirildi', 'error');
+            return res;
+        }
+    }
+}
+
+// ============== LOCAL STORE ==============
+// Masalar, acik siparisler, kalemleri, menu urunleri ve ayarlar yerel depoda
+// tutulur; sunucudan sadece /api/changes?since=<seq> ile fark alinir. Sira
+// numarasi cok eskiyse sunucu tam goruntu (reset) dondurur.
+const STORE_KEY = 'adisyo-store';
+const STORE_ENTITIES = ['tables', 'orders', 'order_items', 'menu_items', 'settings'];
+const LIVE_SYNC_INTERVAL = 5000;
+
+function emptyStore() {
+    const empty = { seq: 0 };
+    STORE_ENTITIES.forEach(entity => { empty[entity] = {}; });
+    return empty;
+}
+
+function loadStore() {
+    try {
+        const saved = JSON.parse(localStorage.getItem(STORE_KEY));
+        if (saved && STORE_ENTITIES.every(entity => saved[entity])) return saved;
+    } catch (e) {
+        // Bozuk kayit: tam goruntuyle bastan al
+    }
+    return emptyStore();
+}
+
+let store = loadStore();
+
+// Farki depoya uygular; bir sey degistiyse true doner
+async function syncChanges() {
+    const res = await api(`/api/changes?since=${store.seq}`);
+    if (!res.success) return false;
+
+    const { seq, reset, changes, deleted } = res.data;
+    if (reset) store = emptyStore();
+    let changed = reset;
+
+    Object.entries(changes).forEach(([entity, rows]) => {
+        rows.forEach(row => {
+            store[entity][entity === 'settings' ? row.key : row.id] = row;
+            changed = true;
+        });
+    });
+    Object.entries(deleted).forEach(([entity, ids]) => {
+        ids.forEach(id => {
+            delete store[entity][id];
+            changed = true;
+        });
+    });
+
+    // Kapanan siparisler ve kalemleri depoda tutulmaz
+    Object.values(store.orders).forEach(order => {
+        if (order.status !== 'open') delete store.orders[order.id];
+    });
+    Object.values(store.order_items).forEach(item => {
+        if (!store.orders[item.order_id]) delete store.order_items[item.id];
+    });
+
+    store.seq = seq;
+    try {
+        localStorage.setItem(STORE_KEY, JSON.stringify(store));
+    } catch (e) {
+        // Kota dolu: depo bellekte kalir
+    }
+    return changed;
+}
+
+// Masalar, acik siparisleri ve kalemleriyle (/api/tables ciktisiyla ayni bicim)
+function tablesFromStore() {
+    const byId = (a, b) => a.id - b.id;
+    const orders = {};
+    Object.values(store.orders).sort(byId).forEach(order => {
+        if (!orders[order.table_id]) orders[order.table_id] = { ...order, items: [] };
+    });
+    const ordersById = {};
+    Object.values(orders).forEach(order => { ordersById[order.id] = order; });
+    Object.values(store.order_items).sort(byId).forEach(item => {
+        const order = ordersById[item.order_id];
+        if (order) order.items.push(item);
+    });
+    return Object.values(store.tables).sort(byId).map(table => ({ ...table, order: orders[table.id] || null }));
+}
+
+// Sayfa acikken depoyu duzenli guncelle, degisiklik varsa yeniden ciz
+// Sayfa basina tek poller; init() bir kez baslatir, tekrar cagrilirsa eskisi durdurulur
+let liveSyncTimer = null;
+
+function startLiveSync(render) {
+    if (liveSyncTimer !== null) clearInterval(liveSyncTimer);
+    liveSyncTimer = setInterval(async () => {
+        if (await syncChanges()) render();
+    }, LIVE_SYNC_INTERVAL);
+}
+
+function liveSyncRenderer(path) {
+    if (path === '/masalar') return renderTablesView;
+    if (path === '/mutfak') return renderKitchenView;
+    return null;
+}
+
 // ============== TOAST ==============
 function showToast(message, type = 'success') {
     const toast = document.getElementById('toast');
@@ -114,6 +236,9 @@ async function init() {
     
     // Load page-specific content
     loadPageContent();
+
+    const liveRender = liveSyncRenderer(path);
+    if (liveRender) startLiveSync(liveRender);
 }
 
 function setupLoginPage() {
@@ -199,10 +324,8 @@ function updateUserUI() {
 
 async function loadData() {
     // Load tables
-    const tablesRes = await api('/api/tables');
-    if (tablesRes.success) {
-        state.tables = tablesRes.data;
-    }
+    await syncChanges();
+    state.tables = tablesFromStore();
 
     // Load menu
     const menuRes = await api('/api/menu');
@@ -283,6 +406,10 @@ function setupEventListeners() {
     const saveCategoryBtn = document.getElementById('save-category-btn');
     if (saveCategoryBtn) saveCategoryBtn.addEventListener('click', saveCategory);
 
+    // Menu search
+    const menuSearchInput = document.getElementById('menu-search-input');
+    if (menuSearchInput) menuSearchInput.addEventListener('input', () => searchMenu(menuSearchInput.value));
+
     // Print Button
     const printOrderBtn = document.getElementById('print-order-btn');
     if (printOrderBtn) printOrderBtn.addEventListener('click', printOrder);
@@ -547,10 +674,8 @@ async function deleteStation(id) {
 // ============== TABLES VIEW ==============
 async function renderTablesView() {
     // Refresh data
-    const res = await api('/api/tables');
-    if (res.success) {
-        state.tables = res.data;
-    }
+    await syncChanges();
+    state.tables = tablesFromStore();
 
     const isAdmin = state.user && state.user.role === 'admin';
     const adminControls = document.getElementById('admin-controls');
@@ -559,7 +684,8 @@ async function renderTablesView() {
     }
 
     const addTableBtn = document.getElementById('add-table-btn');
-    if (addTableBtn && isAdmin) {
+    if (addTableBtn && isAdmin && !addTableBtn.dataset.bound) {
+        addTableBtn.dataset.bound = '1';
         addTableBtn.addEventListener('click', () => {
             const tableForm = document.getElementById('table-form');
             const tableModal = document.getElementById('table-modal');
@@ -574,7 +700,7 @@ async function renderTablesView() {
     grid.innerHTML = '';
 
     state.tables.forEach(table => {
-        const hasOrder = table.order && table.order.items && table.order.items.length > 0;
+        const hasOrder = table.order && table.order.items.length > 0;
         const total = hasOrder ? table.order.total : 0;
         const openedAt = table.opened_at ? new Date(table.opened_at).toLocaleTimeString('tr-TR', { hour: '2-digit', minute: '2-digit' }) : null;
 
@@ -661,6 +787,7 @@ function closeDrawer() {
     
     state.activeTableId = null;
     state.activeOrderId = null;
+    state.activeOrder = null;
     
     // Reload current page content
     loadPageContent();
@@ -693,11 +820,16 @@ function renderCategories() {
 }
 
 function renderMenuItems(categoryKey) {
+    const searchInput = document.getElementById('menu-search-input');
+    if (searchInput) searchInput.value = '';
+    renderMenuItemCards(state.menu[categoryKey] || []);
+}
+
+function renderMenuItemCards(items) {
     const menuItemsGrid = document.getElementById('menu-items-grid');
     if (!menuItemsGrid) return;
     
     menuItemsGrid.innerHTML = '';
-    const items = state.menu[categoryKey] || [];
 
     items.forEach(item => {
         const card = document.createElement('div');
@@ -712,16 +844,27 @@ function renderMenuItems(categoryKey) {
     });
 }
 
+// Sunucudaki indeksle arama; sadece son istegin sonucu cizilir
+let menuSearchSeq = 0;
+async function searchMenu(query) {
+    if (!query.trim()) {
+        renderMenuItemCards(state.menu[state.activeCategory] || []);
+        return;
+    }
+
+    const seq = ++menuSearchSeq;
+    const res = await api(`/api/menu/search?q=${encodeURIComponent(query)}`);
+    if (seq !== menuSearchSeq || !res.success) return;
+    renderMenuItemCards(res.data);
+}
+
 async function addToOrder(item) {
     if (!state.activeOrderId) return;
 
-    const res = await api(`/api/orders/${state.activeOrderId}/items`, {
-        method: 'POST',
-        body: JSON.stringify({
-            menu_item_id: item.id,
-            quantity: 1
-        })
-    });
+    const res = await orderApi(`/api/orders/${state.activeOrderId}/items`, 'POST', () => ({
+        menu_item_id: item.id,
+        quantity: 1
+    }));
 
     if (res.success) {
         renderCart(res.data);
@@ -730,29 +873,13 @@ async function addToOrder(item) {
 }
 
 async function updateItemQuantity(itemId, change) {
-    const tableRes = await api(`/api/tables/${state.activeTableId}`);
-    const order = tableRes.data.order;
-    const item = order.items.find(i => i.id === itemId);
-
-    if (!item) return;
-
-    const newQty = item.quantity + change;
-
-    if (newQty <= 0) {
-        const res = await api(`/api/orders/${state.activeOrderId}/items/${itemId}`, {
-            method: 'DELETE'
-        });
-        if (res.success) {
-            renderCart(res.data);
-        }
-    } else {
-        const res = await api(`/api/orders/${state.activeOrderId}/items/${itemId}`, {
-            method: 'PUT',
-            body: JSON.stringify({ quantity: newQty })
-        });
-        if (res.success) {
-            renderCart(res.data);
-        }
+    // Miktar 0 olursa sunucu kalemi siler
+    const res = await orderApi(`/api/orders/${state.activeOrderId}/items/${itemId}`, 'PUT', order => {
+        const item = order && order.items.find(i => i.id === itemId);
+        return item ? { quantity: item.quantity + change } : null;
+    });
+    if (res.success) {
+        renderCart(res.data);
     }
 }
 
@@ -762,6 +889,7 @@ function renderCart(order) {
     const cartTax = document.getElementById('cart-tax');
     const cartTotal = document.getElementById('cart-total');
     
+    state.activeOrder = order || null;
     if (!cartItems) return;
     
     cartItems.innerHTML = '';
@@ -905,16 +1033,16 @@ async function updatePaymentSummary() {
 async function processPayment() {
     if (!state.activeOrderId) return;
 
-    const res = await api(`/api/orders/${state.activeOrderId}/payment`, {
-        method: 'POST',
-        body: JSON.stringify({
-            discount_type: state.paymentData.discountType,
-            discount_value: state.paymentData.discountValue,
-            payment_method: state.paymentData.paymentMethod
-        })
-    });
+    // Tutar degismis olabilecegi icin odeme otomatik tekrar denenmez
+    const res = await orderApi(`/api/orders/${state.activeOrderId}/payment`, 'POST', () => ({
+        discount_type: state.paymentData.discountType,
+        discount_value: state.paymentData.discountValue,
+        payment_method: state.paymentData.paymentMethod
+    }), { retries: 0 });
 
-    if (res.success) {
+    if (res.conflict) {
+        updatePaymentSummary();
+    } else if (res.success) {
         closeAllModals();
         closeDrawer();
         showToast('Ödeme başarıyla alındı!');
@@ -959,10 +1087,7 @@ async function saveNote() {
         return;
     }
 
-    const res = await api(`/api/orders/${state.activeOrderId}/items/${itemId}`, {
-        method: 'PUT',
-        body: JSON.stringify({ note })
-    });
+    const res = await orderApi(`/api/orders/${state.activeOrderId}/items/${itemId}`, 'PUT', () => ({ note }));
 
     if (res.success) {
         renderCart(res.data);
@@ -978,8 +1103,8 @@ function closeAllModals() {
 
 // ============== KITCHEN VIEW ==============
 async function renderKitchenView() {
-    const tablesRes = await api('/api/tables');
-    const tables = tablesRes.data.filter(t => t.order && t.order.items && t.order.items.length > 0);
+    await syncChanges();
+    const tables = tablesFromStore().filter(t => t.order && t.order.items.length > 0);
 
     const content = document.getElementById('kitchen-content');
     if (!content) return;
@@ -1008,7 +1133,7 @@ async function renderKitchenView() {
                 </div>
                 <ul class="kitchen-items">
                     ${table.order.items.map(item => `
-                        <li>
+                        <li class="${item.served_at ? 'served' : ''}" data-order-id="${table.order.id}" data-item-id="${item.id}" title="Servis edildi olarak işaretle">
                             <span class="item-qty">${item.quantity}x</span>
                             <span class="item-name">${item.name}</span>
                             ${item.note ? `<span class="item-note">${item.note}</span>` : ''}
@@ -1020,6 +1145,14 @@ async function renderKitchenView() {
     });
 
     content.innerHTML = html;
+
+    // Kaleme dokunmak servis edildi olarak isaretler (fis gecikmesi raporu icin)
+    content.querySelectorAll('.kitchen-items li:not(.served)').forEach(li => {
+        li.addEventListener('click', async () => {
+            const res = await api(`/api/orders/${li.dataset.orderId}/items/${li.dataset.itemId}/served`, { method: 'POST' });
+            if (res.success) renderKitchenView();
+        });
+    });
 }
 
 // ============== REPORTS VIEW ==============
@@ -1143,8 +1276,8 @@ async function renderReportsView() {
 
 // ============== MENU MANAGEMENT VIEW ==============
 async function renderMenuManagementView() {
-    const itemsRes = await api('/api/menu/items');
-    const items = itemsRes.data;
+    await syncChanges();
+    const items = Object.values(store.menu_items).sort((a, b) => a.id - b.id);
 
     const catRes = await api('/api/categories');
     state.categories = catRes.data;